@@ -0,0 +1,1147 @@
+bl_info = {
+    "name": "FCurve Smooth Brush",
+    "author": "Evilmushroom/Claude",
+    "version": (1, 6),
+    "blender": (3, 6, 0),
+    "location": "Graph Editor > Sidebar > Tool",
+    "description": "Paint to smooth FCurves in the Graph Editor",
+    "doc_url": "https://github.com/evilmushroom/FCurve_Smooth_Brush",
+    "category": "Animation",
+}
+
+import bpy
+from bpy.props import FloatProperty, IntProperty, BoolProperty, EnumProperty, StringProperty
+from mathutils import Vector
+import time
+import os
+
+# NumPy, the GPU modules and the brush engine are imported where they are
+# first needed, so enabling the add-on only registers its classes and
+# start-up doesn't pay for them until the brush is used
+
+# GPU batches of a unit circle, built on first draw and reused every frame
+_draw_cache = {}
+
+def get_brush_batches():
+    """Return the shader and unit ring/disc batches, creating them once"""
+    if not _draw_cache:
+        import gpu
+        import numpy as np
+        from gpu_extras.batch import batch_for_shader
+        
+        segments = 32
+        angles = np.linspace(0.0, 2.0 * np.pi, segments, endpoint=False)
+        ring = np.column_stack((np.cos(angles), np.sin(angles))).astype(np.float32)
+        disc = np.vstack(((0.0, 0.0), ring)).astype(np.float32)
+        rim = np.arange(1, segments + 1)
+        indices = np.column_stack((np.zeros(segments, dtype=np.int32), rim, np.roll(rim, -1)))
+        
+        shader = gpu.shader.from_builtin('UNIFORM_COLOR')
+        _draw_cache['shader'] = shader
+        _draw_cache['ring'] = batch_for_shader(shader, 'LINE_LOOP', {"pos": ring})
+        _draw_cache['disc'] = batch_for_shader(shader, 'TRIS', {"pos": disc},
+                                               indices=indices.tolist())
+    return _draw_cache['shader'], _draw_cache['ring'], _draw_cache['disc']
+
+def draw_circle(shader, batch, center, radius, color):
+    """Draw a unit circle batch moved to center and scaled to radius"""
+    import gpu
+    gpu.matrix.push()
+    gpu.matrix.translate(center)
+    gpu.matrix.scale((radius, radius))
+    shader.uniform_float("color", color)
+    batch.draw(shader)
+    gpu.matrix.pop()
+
+def draw_brush_overlay(self, context):
+    import gpu
+    props = context.scene.fcurve_smooth_brush
+    radius = props.brush_size
+    center = (self.last_mouse_region_x, self.last_mouse_region_y)
+    
+    shader, ring, disc = get_brush_batches()
+    shader.bind()
+    gpu.state.blend_set('ALPHA')
+    
+    if self.is_painting:
+        # Same opacity as stacking four 0.15..0.0375 passes, in one draw
+        alpha = 1.0 - (1.0 - 0.15 * props.strength) * (1.0 - 0.1125 * props.strength) \
+            * (1.0 - 0.075 * props.strength) * (1.0 - 0.0375 * props.strength)
+        draw_circle(shader, disc, center, radius, (1.0, 1.0, 1.0, alpha))
+    
+    # Cursor circle and center dot
+    draw_circle(shader, ring, center, radius, (1.0, 1.0, 1.0, 0.8))
+    draw_circle(shader, ring, center, 2.0, (1.0, 1.0, 1.0, 1.0))
+    gpu.state.blend_set('NONE')
+    
+    if props.show_stats:
+        draw_stats_overlay(self, context)
+
+def draw_stats_overlay(self, context):
+    import blf
+    props = context.scene.fcurve_smooth_brush
+    font_id = 0
+    blf.size(font_id, 12)
+    blf.color(font_id, 1.0, 1.0, 1.0, 0.9)
+    
+    # Stack the lines to the right of the brush cursor
+    x = self.last_mouse_region_x + props.brush_size + 12
+    y = self.last_mouse_region_y + 40
+    for line in self.engine.stats.summary_lines():
+        blf.position(font_id, x, y, 0)
+        blf.draw(font_id, line)
+        y -= 15
+
+# bpy.data collection of every ID type that can own F-Curves
+ID_COLLECTIONS = {
+    'ACTION': "actions",
+    'OBJECT': "objects",
+    'MESH': "meshes",
+    'CURVE': "curves",
+    'ARMATURE': "armatures",
+    'KEY': "shape_keys",
+    'MATERIAL': "materials",
+    'NODETREE': "node_groups",
+    'CAMERA': "cameras",
+    'LIGHT': "lights",
+    'WORLD': "worlds",
+    'SCENE': "scenes",
+    'TEXTURE': "textures",
+    'LATTICE': "lattices",
+    'GREASEPENCIL': "grease_pencils",
+    'SPEAKER': "speakers",
+    'PARTICLE': "particles",
+    'MOVIECLIP': "movieclips",
+    'MASK': "masks",
+    'CACHEFILE': "cache_files",
+}
+
+def find_id(id_type, name):
+    """Look up an ID by type and name, None if it doesn't exist"""
+    collection = getattr(bpy.data, ID_COLLECTIONS.get(id_type, ""), None)
+    if collection is None or name is None:
+        return None
+    return collection.get(name)
+
+# The custom falloff is a Float Curve node's mapping, kept in a hidden node group
+FALLOFF_GROUP_NAME = ".FCurve Brush Falloff"
+FALLOFF_CURVE_SAMPLES = 256
+
+def falloff_curve_node(create=False):
+    """Return the Float Curve node holding the custom falloff, None if it doesn't exist yet"""
+    group = bpy.data.node_groups.get(FALLOFF_GROUP_NAME)
+    if group is None:
+        if not create:
+            return None
+        group = bpy.data.node_groups.new(FALLOFF_GROUP_NAME, 'ShaderNodeTree')
+        group.use_fake_user = True
+    node = group.nodes.get("Falloff")
+    if node is None and create:
+        node = group.nodes.new('ShaderNodeFloatCurve')
+        node.name = "Falloff"
+    return node
+
+def custom_falloff_samples(node):
+    """Sample the custom falloff curve from the brush centre (x = 1) to the rim (x = 0)"""
+    import numpy as np
+    mapping = node.mapping
+    mapping.initialize()
+    curve = mapping.curves[0]
+    return np.array([mapping.evaluate(curve, 1.0 - distance)
+                     for distance in np.linspace(0.0, 1.0, FALLOFF_CURVE_SAMPLES)])
+
+def update_falloff_type(self, context):
+    """Create the custom falloff curve the first time it is chosen"""
+    if self.falloff_type == 'CUSTOM':
+        falloff_curve_node(create=True)
+
+# Then define your classes
+class FCurveSmoothBrushProperties(bpy.types.PropertyGroup):
+    brush_size: FloatProperty(
+        name="Brush Size",
+        description="Size of the brush",
+        default=50.0,
+        min=1.0,
+        max=500.0,
+        subtype='FACTOR'  # Makes it display as a slider
+    )
+    strength: FloatProperty(
+        name="Strength",
+        description="Strength of the brush effect",
+        default=0.5,
+        min=0.0,
+        max=1.0,
+        subtype='FACTOR'  # Makes it display as a slider
+    )
+    falloff_type: EnumProperty(
+        name="Falloff",
+        description="How the brush effect fades from its centre to its edge",
+        items=[
+            ('SMOOTH', "Smooth", "Quadratic falloff, strongest over most of the brush"),
+            ('LINEAR', "Linear", "Falls off evenly with distance"),
+            ('CONSTANT', "Constant", "Full strength across the whole brush"),
+            ('SHARP', "Sharp", "Concentrated at the centre of the brush"),
+            ('GAUSSIAN', "Gaussian", "Bell-shaped falloff"),
+            ('CUSTOM', "Custom", "Falloff drawn as a curve, from the edge (left) to the centre (right)")
+        ],
+        default='SMOOTH',
+        update=update_falloff_type
+    )
+    spacing: FloatProperty(
+        name="Spacing",
+        description="Distance between brush dabs along the stroke, as a fraction of the brush size",
+        default=0.25,
+        min=0.02,
+        max=2.0,
+        subtype='FACTOR'
+    )
+    iterations: IntProperty(
+        name="Iterations",
+        description="Number of smoothing passes applied by each dab",
+        default=1,
+        min=1,
+        max=10
+    )
+    smooth_radius: IntProperty(
+        name="Kernel Width",
+        description="Keyframes on each side averaged by every smoothing pass",
+        default=1,
+        min=1,
+        max=50
+    )
+    brush_mode: EnumProperty(
+        name="Brush Mode",
+        description="Brush operation mode",
+        items=[
+            ('SMOOTH', "Smooth", "Smooth keyframes"),
+            ('NOISE', "Noise", "Add controlled noise"),
+            ('FLATTEN', "Flatten", "Flatten to average value"),
+            ('SHARPEN', "Sharpen", "Increase contrast between keyframes"),
+            ('RELAX', "Relax", "Evenly space keyframes"),
+            ('RELATIVE', "Relative", "Smooth while keeping each keyframe's position between its neighbours"),
+            ('DECIMATE', "Decimate", "Remove keyframes the curve can do without, within an error tolerance")
+        ],
+        default='SMOOTH'
+    )
+    flatten_target: EnumProperty(
+        name="Flatten Target",
+        description="Value the Flatten mode pulls keyframes toward",
+        items=[
+            ('CURVE', "Curve Average", "Average of the whole curve at stroke start"),
+            ('BRUSH', "Brush Average", "Average of the keyframes under the brush at stroke start"),
+            ('WINDOW', "Local Average", "Moving average around each keyframe at stroke start")
+        ],
+        default='CURVE'
+    )
+    flatten_window: IntProperty(
+        name="Window",
+        description="Keyframes on each side averaged by the Local Average target",
+        default=5,
+        min=1,
+        max=500
+    )
+    noise_type: EnumProperty(
+        name="Noise Type",
+        description="Kind of noise added by the Noise mode",
+        items=[
+            ('WHITE', "White", "An independent random offset on every frame"),
+            ('VALUE', "Value", "Smoothly eased random values"),
+            ('PERLIN', "Perlin", "Coherent gradient noise")
+        ],
+        default='PERLIN'
+    )
+    noise_frequency: FloatProperty(
+        name="Frequency",
+        description="Noise cycles per frame for Value and Perlin noise",
+        default=0.1,
+        min=0.001,
+        max=1.0
+    )
+    noise_amplitude: FloatProperty(
+        name="Amplitude",
+        description="Largest offset the noise adds to a keyframe",
+        default=1.0,
+        min=0.0,
+        max=100.0
+    )
+    noise_seed: IntProperty(
+        name="Seed",
+        description="Seed of the noise, the same seed always gives the same noise",
+        default=0,
+        min=0
+    )
+    decimate_error: FloatProperty(
+        name="Error Tolerance",
+        description="Largest change in value Decimate may cause when it removes keyframes",
+        default=0.01,
+        min=0.0,
+        max=10.0,
+        precision=4
+    )
+    affect_selected: BoolProperty(
+        name="Selected Only",
+        description="Only affect selected keyframes",
+        default=False
+    )
+    select_while_painting: BoolProperty(
+        name="Select While Painting",
+        description="Auto-select keyframes under brush",
+        default=False
+    )
+    auto_frame: BoolProperty(
+        name="Auto Frame",
+        description="Pan or zoom the view to keep the keyframes being brushed in sight",
+        default=False
+    )
+    auto_frame_margin: FloatProperty(
+        name="Frame Margin",
+        description="Part of the view kept clear on each side before the view follows the brushed keyframes",
+        default=0.1,
+        min=0.0,
+        max=0.45,
+        subtype='FACTOR'
+    )
+    auto_frame_interval: FloatProperty(
+        name="Frame Interval",
+        description="Minimum time between view changes while painting, in seconds",
+        default=0.1,
+        min=0.0,
+        max=1.0
+    )
+    auto_frame_on_release: BoolProperty(
+        name="Frame on Release",
+        description="Only frame the keyframes brushed during a stroke once it ends",
+        default=False
+    )
+    preserve_handles: BoolProperty(
+        name="Preserve Handles",
+        description="Move handles together with their keyframes so free and aligned handles keep their shape. Auto handles are recalculated with the curve",
+        default=True
+    )
+    defer_update: BoolProperty(
+        name="Deferred Update",
+        description="Recalculate the edited curves once when a stroke ends instead of after every dab. Auto handles lag behind the keys until then",
+        default=True
+    )
+    use_threads: BoolProperty(
+        name="Multi-threaded",
+        description="Run the brush math for large selections on a pool of worker threads",
+        default=False
+    )
+    thread_min_curves: IntProperty(
+        name="Thread Threshold",
+        description="Minimum number of brushed curves before the worker threads are used",
+        default=32,
+        min=2,
+        max=10000
+    )
+    thread_count: IntProperty(
+        name="Threads",
+        description="Number of worker threads, 0 uses one per CPU core",
+        default=0,
+        min=0,
+        max=256
+    )
+    use_async: BoolProperty(
+        name="Background Compute",
+        description="Compute the brush on a worker thread so the cursor stays responsive on heavy curves",
+        default=False
+    )
+    undo_memory: FloatProperty(
+        name="Undo Memory",
+        description="Memory budget of the brush's own undo history, in megabytes",
+        default=64.0,
+        min=1.0,
+        max=4096.0
+    )
+    cache_memory: FloatProperty(
+        name="Cache Memory",
+        description="Memory budget for keyframe data kept between dabs and strokes, in megabytes",
+        default=256.0,
+        min=1.0,
+        max=16384.0
+    )
+    show_stats: BoolProperty(
+        name="Show Performance Stats",
+        description="Time the brush's stages and show the numbers next to the cursor",
+        default=False
+    )
+    stats_log_path: StringProperty(
+        name="Stats Log",
+        description="If set, append each stroke's performance stats to this file as a JSON line",
+        default="",
+        subtype='FILE_PATH'
+    )
+    record_strokes: BoolProperty(
+        name="Record Strokes",
+        description="Save every stroke to the recording folder so it can be replayed on other curves",
+        default=False
+    )
+    record_dir: StringProperty(
+        name="Recording Folder",
+        description="Folder recorded strokes are saved to, one .npz file per stroke",
+        default="//strokes/",
+        subtype='DIR_PATH'
+    )
+    is_active: BoolProperty(
+        name="Brush Active",
+        description="Whether brush is active",
+        default=False
+    )
+
+class FCurveSmoothBrushOperator(bpy.types.Operator):
+    bl_idname = "graph.fcurve_smooth_brush"
+    bl_label = "FCurve Smooth Brush"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    def __init__(self):
+        # Operators are only instantiated when run, the engine loads here
+        from .brush_engine import AsyncStroke, BrushEngine, UndoHistory
+        self.mouse_pos = Vector((0, 0))
+        self._handle = None
+        self.is_painting = False
+        self.stroke_buffer = []
+        self.stroke_spacer = None
+        self.pending_dabs = []
+        self.last_mouse_region_x = 0
+        self.last_mouse_region_y = 0
+        self.last_process_time = 0
+        self.process_interval = 0.032
+        # Event timer applying queued dabs while the mouse rests
+        self._process_timer = None
+        self.active_stroke = False
+        self.undo_history = UndoHistory()
+        self.engine = BrushEngine()
+        self.keyframe_cache = self.engine.keyframe_cache
+        self.async_stroke = AsyncStroke(self.engine)
+        self.stroke_region = None
+        self.stroke_area = None
+        self.stroke_window = None
+        # Edited keys not framed yet, and when the view last followed them
+        self.frame_bounds = None
+        self.last_frame_time = 0
+        # Custom falloff samples and the curve points they were taken from
+        self.falloff_samples = None
+        self.falloff_signature = None
+        # Keep one bound method so the timer can be found again
+        self._async_tick = self.async_tick
+        
+    def clear_cache(self):
+        """Clear all cached data to prevent memory leaks"""
+        self.keyframe_cache.clear()
+        self.engine.clear()
+        self.stroke_buffer.clear()
+        
+    def cleanup_handlers(self):
+        """Remove draw handlers safely"""
+        if self._handle is not None:
+            try:
+                bpy.types.SpaceGraphEditor.draw_handler_remove(self._handle, 'WINDOW')
+            except:
+                pass
+            self._handle = None
+        self.remove_process_timer()
+        if bpy.app.timers.is_registered(self._async_tick):
+            bpy.app.timers.unregister(self._async_tick)
+        self.async_stroke.shutdown()
+        self.engine.shutdown()
+        self.undo_history.clear()
+        self.stroke_buffer.clear()
+
+    def remove_process_timer(self):
+        """Stop the event timer of the stroke being painted"""
+        if self._process_timer is not None:
+            try:
+                bpy.context.window_manager.event_timer_remove(self._process_timer)
+            except:
+                pass
+            self._process_timer = None
+
+    def find_fcurve(self, key):
+        """Look up an F-Curve by its curve_key, None if it no longer exists
+
+        Animation curves live in their Action, drivers in the animation
+        data of the ID they drive.
+        """
+        id_type, name, data_path, array_index = key
+        owner = find_id(id_type, name)
+        if owner is None:
+            return None
+        if id_type == 'ACTION':
+            return owner.fcurves.find(data_path, index=array_index)
+        animation_data = getattr(owner, "animation_data", None)
+        if animation_data is None:
+            return None
+        return animation_data.drivers.find(data_path, index=array_index)
+
+    def apply_undo_record(self, record, redo=False):
+        """Revert (or reapply) a recorded stroke"""
+        record.apply(self.find_fcurve, redo=redo)
+        # Cached extents and frames no longer describe the curves
+        self.engine.invalidate()
+
+    def begin_stroke(self):
+        """Initialize stroke state"""
+        self.active_stroke = True
+        self.stroke_buffer.clear()
+        self.stroke_spacer = None
+        props = bpy.context.scene.fcurve_smooth_brush
+        self.keyframe_cache.budget_bytes = int(props.cache_memory * 1024 * 1024)
+        # Selection can't change mid-stroke, gather the curves once
+        self.engine.begin_stroke(bpy.context.selected_editable_fcurves,
+                                 stats_enabled=props.show_stats or bool(props.stats_log_path))
+        self.stroke_region = bpy.context.region
+        self.stroke_area = bpy.context.area
+        self.stroke_window = bpy.context.window
+        if self._process_timer is None:
+            self._process_timer = bpy.context.window_manager.event_timer_add(
+                self.process_interval, window=bpy.context.window)
+        self.frame_bounds = None
+        self.engine.custom_falloff = self.custom_falloff(props)
+        from .brush_engine import StrokeRecording
+        self.engine.capture = StrokeRecording() if props.record_strokes and props.record_dir else None
+        if props.use_async and not bpy.app.timers.is_registered(self._async_tick):
+            bpy.app.timers.register(self._async_tick, first_interval=0.0)
+        
+    def custom_falloff(self, props):
+        """Samples of the custom falloff, taken again only after its curve was edited"""
+        node = falloff_curve_node() if props.falloff_type == 'CUSTOM' else None
+        if node is None:
+            return None
+        points = node.mapping.curves[0].points
+        signature = tuple((point.location[0], point.location[1], point.handle_type) for point in points)
+        if signature != self.falloff_signature:
+            self.falloff_signature = signature
+            self.falloff_samples = custom_falloff_samples(node)
+        return self.falloff_samples
+        
+    def add_stroke_sample(self, context, x, y):
+        """Record a mouse sample and queue the evenly spaced dabs it produces"""
+        self.stroke_buffer.append((x, y))
+        if self.stroke_spacer is None:
+            from .brush_engine import StrokeSpacer
+            props = context.scene.fcurve_smooth_brush
+            self.stroke_spacer = StrokeSpacer(props.brush_size * props.spacing)
+            dabs = self.stroke_spacer.start(x, y)
+        else:
+            dabs = self.stroke_spacer.add(x, y)
+        self.pending_dabs.extend(dabs.tolist())
+        
+    def end_stroke(self, context):
+        """Finalize stroke"""
+        if self.active_stroke:
+            self.active_stroke = False
+            self.remove_process_timer()
+            props = context.scene.fcurve_smooth_brush
+            region = self.stroke_region
+            # Wait for the batch still computing in the background
+            self.async_stroke.flush(region.view2d, (region.width, region.height), props)
+            self.auto_frame(props, final=True)
+            # Don't use Blender's undo system directly, keep only what the stroke touched
+            self.undo_history.budget_bytes = int(props.undo_memory * 1024 * 1024)
+            self.undo_history.push(self.engine.end_stroke())
+            if props.stats_log_path:
+                self.export_stats(props)
+            if self.engine.capture is not None:
+                self.save_recording(props, self.engine.capture)
+                self.engine.capture = None
+            self.stroke_buffer.clear()
+            self.stroke_spacer = None
+            self.pending_dabs.clear()
+    
+    def process_pending_dabs(self, context):
+        """Apply the queued dabs once the last batch is process_interval old
+
+        Dabs are never dropped, the interval only controls how many get
+        batched.
+        """
+        current_time = time.time()
+        if self.pending_dabs and current_time - self.last_process_time >= self.process_interval:
+            self.smooth_curves(context)
+            self.last_process_time = current_time
+    
+    def export_stats(self, props):
+        """Append the finished stroke's stats to the log file as one JSON line"""
+        path = bpy.path.abspath(props.stats_log_path)
+        line = self.engine.stats.to_json(mode=props.brush_mode, brush_size=props.brush_size,
+                                         curves=len(self.engine.curves))
+        try:
+            with open(path, 'a', encoding='utf-8') as log:
+                log.write(line + os.linesep)
+        except OSError as error:
+            self.report({'WARNING'}, f"Could not write brush stats: {error}")
+    
+    def save_recording(self, props, recording):
+        """Write a recorded stroke to the recording folder"""
+        if not len(recording):
+            return
+        folder = bpy.path.abspath(props.record_dir)
+        name = time.strftime("stroke_%Y%m%d_%H%M%S") + f"_{int(time.time() * 1000) % 1000:03d}.npz"
+        try:
+            os.makedirs(folder, exist_ok=True)
+            recording.save(os.path.join(folder, name))
+        except OSError as error:
+            self.report({'WARNING'}, f"Could not save stroke recording: {error}")
+    
+    def modal(self, context, event):
+        # Always update mouse position
+        self.last_mouse_region_x = event.mouse_region_x
+        self.last_mouse_region_y = event.mouse_region_y
+        
+        # Handle navigation events
+        if event.alt:
+            context.window.cursor_set('DEFAULT')
+            # Other tools may edit keys, cached arrays can't be trusted
+            self.engine.invalidate()
+            return {'PASS_THROUGH'}
+            
+        # Pass through navigation events
+        if event.type in {'MIDDLEMOUSE', 'WHEELUPMOUSE', 'WHEELDOWNMOUSE', 
+                         'NUMPAD_PERIOD', 'HOME', 'NUMPAD_1', 'NUMPAD_2', 
+                         'NUMPAD_3', 'NUMPAD_4', 'NUMPAD_6', 'NUMPAD_7', 
+                         'NUMPAD_8', 'NUMPAD_9', 'NUMPAD_5'}:
+            context.window.cursor_set('DEFAULT')
+            return {'PASS_THROUGH'}
+            
+        # Handle ESC to properly deactivate the addon
+        if event.type == 'ESC':
+            self.cleanup_handlers()
+            context.window.cursor_set('DEFAULT')
+            context.scene.fcurve_smooth_brush.is_active = False  # Properly deactivate the addon
+            return {'CANCELLED'}
+        
+        if not context.scene.fcurve_smooth_brush.is_active:
+            self.cleanup_handlers()
+            context.window.cursor_set('DEFAULT')
+            return {'CANCELLED'}
+        
+        # Dabs queued by the last mouse move are applied even if the mouse stops
+        if event.type == 'TIMER':
+            if self.is_painting:
+                self.process_pending_dabs(context)
+            return {'PASS_THROUGH'}
+
+        # Handle custom undo/redo, not mid-stroke: the stroke's own record and
+        # any batch still being computed would write over the restored keys
+        if event.type in {'Z', 'Y'} and event.ctrl and event.value == 'PRESS':
+            if self.is_painting:
+                return {'RUNNING_MODAL'}
+            if event.type == 'Y' or event.shift:  # Redo
+                record = self.undo_history.redo()
+                if record is not None:
+                    self.apply_undo_record(record, redo=True)
+            else:  # Undo
+                record = self.undo_history.undo()
+                if record is not None:
+                    self.apply_undo_record(record)
+            context.area.tag_redraw()
+            return {'RUNNING_MODAL'}
+
+        # Check UI regions
+        for region in context.area.regions:
+            if region.type in {'UI', 'TOOLS', 'HEADER', 'CHANNELS', 'HUD'}:
+                if (event.mouse_x >= region.x and 
+                    event.mouse_x < region.x + region.width and
+                    event.mouse_y >= region.y and 
+                    event.mouse_y < region.y + region.height):
+                    context.window.cursor_set('DEFAULT')
+                    self.engine.invalidate()
+                    return {'PASS_THROUGH'}
+        
+        context.window.cursor_set('NONE')  # Set cursor to none when over valid area
+        
+        if event.type == 'MOUSEMOVE':
+            self.mouse_pos = Vector((event.mouse_region_x, event.mouse_region_y))
+            context.area.tag_redraw()
+            
+            if self.is_painting:
+                self.add_stroke_sample(context, event.mouse_region_x, event.mouse_region_y)
+                self.process_pending_dabs(context)
+        
+        elif event.type == 'LEFTMOUSE':
+            if event.value == 'PRESS':
+                self.is_painting = True
+                self.begin_stroke()  # Initialize stroke properly
+                self.add_stroke_sample(context, event.mouse_region_x, event.mouse_region_y)
+                self.smooth_curves(context)
+                self.last_process_time = time.time()
+            elif event.value == 'RELEASE':
+                if self.is_painting:
+                    self.is_painting = False
+                    self.smooth_curves(context)  # Flush dabs still waiting
+                    self.end_stroke(context)  # End stroke properly
+        
+        return {'RUNNING_MODAL'}
+    
+    def invoke(self, context, event):
+        if context.area.type == 'GRAPH_EDITOR':
+            # Clean up any existing handlers first
+            self.cleanup_handlers()
+            self.clear_cache()
+            
+            if not context.scene.fcurve_smooth_brush.is_active:
+                context.scene.fcurve_smooth_brush.is_active = True
+                self.mouse_pos = Vector((event.mouse_region_x, event.mouse_region_y))
+                
+                # Add draw handler
+                args = (self, context)
+                self._handle = bpy.types.SpaceGraphEditor.draw_handler_add(
+                    draw_brush_overlay, args, 'WINDOW', 'POST_PIXEL')
+                
+                context.window_manager.modal_handler_add(self)
+                return {'RUNNING_MODAL'}
+                
+        return {'CANCELLED'}
+    
+    def __del__(self):
+        """Cleanup when operator is deleted"""
+        self.cleanup_handlers()
+        self.clear_cache()
+
+    def async_tick(self):
+        """Timer callback committing background results while a stroke is painted"""
+        if not self.active_stroke:
+            return None
+        props = bpy.context.scene.fcurve_smooth_brush
+        region = self.stroke_region
+        if self.async_stroke.step(region.view2d, (region.width, region.height), props):
+            self.auto_frame(props)
+            self.stroke_area.tag_redraw()
+        return 0.01
+
+    def auto_frame(self, props, final=False):
+        """Keep the keys the stroke edited in view, using bounds the engine already has
+
+        Follows the keys only once they leave the view's margin, at most
+        every Frame Interval seconds, with any skipped keys framed at the
+        end of the stroke; with Frame on Release only when it ends.
+        """
+        if not props.auto_frame:
+            return
+        if props.auto_frame_on_release:
+            if not final:
+                return
+            bounds = self.engine.stroke_bounds
+        else:
+            from .brush_engine import union_bounds
+            self.frame_bounds = union_bounds(self.frame_bounds, self.engine.edited_bounds)
+            now = time.perf_counter()
+            if not final and now - self.last_frame_time < props.auto_frame_interval:
+                return
+            self.last_frame_time = now
+            bounds = self.frame_bounds
+        self.frame_bounds = None
+        if bounds is not None:
+            with self.engine.stats.stage('auto_frame'):
+                self.frame_region(bounds, props.auto_frame_margin)
+
+    def frame_region(self, bounds, margin):
+        """Pan the stroke's region, or zoom it out, until ``bounds`` sit inside the margin"""
+        import numpy as np
+        from .brush_engine import frame_view, visible_rect
+        region = self.stroke_region
+        view = region.view2d
+        (frame_min, frame_max), (value_min, value_max) = visible_rect(view, region.width, region.height)
+        target = frame_view((frame_min, frame_max, value_min, value_max), bounds, margin)
+        if target is None:
+            return
+        same_zoom = np.allclose((target[1] - target[0], target[3] - target[2]),
+                                (frame_max - frame_min, value_max - value_min))
+        with bpy.context.temp_override(window=self.stroke_window, area=self.stroke_area, region=region):
+            if same_zoom:
+                # Same zoom, panning only moves the view
+                dx = (target[0] - frame_min) / (frame_max - frame_min) * region.width
+                dy = (target[2] - value_min) / (value_max - value_min) * region.height
+                bpy.ops.view2d.pan(deltax=round(dx), deltay=round(dy))
+            else:
+                x_min, y_min = view.view_to_region(target[0], target[2], clip=False)
+                x_max, y_max = view.view_to_region(target[1], target[3], clip=False)
+                bpy.ops.view2d.zoom_border(xmin=x_min, xmax=x_max, ymin=y_min, ymax=y_max,
+                                           wait_for_input=False, zoom_out=False)
+
+    def smooth_curves(self, context):
+        """Main function to process and smooth the curves under the brush
+
+        Applies every dab queued since the last call in one pass per curve.
+        """
+        if not self.pending_dabs:
+            return
+        if not self.active_stroke:
+            self.begin_stroke()
+        dabs = self.pending_dabs
+        self.pending_dabs = []
+        
+        props = context.scene.fcurve_smooth_brush
+        region = context.region
+        if props.use_async:
+            # Curves change when a timer tick commits the background result
+            self.async_stroke.queue(dabs)
+            self.async_stroke.step(region.view2d, (region.width, region.height), props)
+            return
+        if self.engine.apply_dabs(region.view2d, (region.width, region.height), dabs, props):
+            self.auto_frame(props)
+
+SCOPE_ITEMS = [
+    ('SELECTED', "Selected Curves", "Selected, visible F-Curves in the Graph Editor"),
+    ('ACTIVE_ACTION', "Active Action", "Every F-Curve of the active object's action"),
+    ('OBJECT_ACTIONS', "Selected Objects", "Every F-Curve of the selected objects' actions"),
+    ('ALL_ACTIONS', "All Actions", "Every F-Curve of every action in the file")
+]
+
+def gather_scope_fcurves(context, scope):
+    """Yield the F-Curves of a SCOPE_ITEMS scope one at a time, with the total count"""
+    if scope == 'SELECTED':
+        fcurves = [fc for fc in (getattr(context, "selected_editable_fcurves", None) or [])
+                   if not fc.hide]
+        return len(fcurves), iter(fcurves)
+    
+    if scope == 'ALL_ACTIONS':
+        actions = list(bpy.data.actions)
+    else:
+        objects = [context.active_object] if scope == 'ACTIVE_ACTION' else context.selected_objects
+        actions = []
+        for obj in objects:
+            action = obj.animation_data.action if obj and obj.animation_data else None
+            if action is not None and action not in actions:
+                actions.append(action)
+    
+    total = sum(len(action.fcurves) for action in actions)
+    return total, (fc for action in actions for fc in action.fcurves)
+
+class FCurveBatchFilterOperator(bpy.types.Operator):
+    """Filter whole F-Curves or actions without painting"""
+    bl_idname = "graph.fcurve_batch_filter"
+    bl_label = "Batch Filter FCurves"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    scope: EnumProperty(
+        name="Curves",
+        description="Which F-Curves to filter",
+        items=SCOPE_ITEMS,
+        default='SELECTED'
+    )
+    filter_mode: EnumProperty(
+        name="Filter",
+        description="Operation applied to the keyframes",
+        items=[
+            ('SMOOTH', "Smooth", "Average keyframes with their neighbours"),
+            ('SHARPEN', "Sharpen", "Increase contrast between keyframes"),
+            ('FLATTEN', "Flatten", "Flatten toward the average value of the range"),
+            ('NOISE', "Noise", "Add controlled noise"),
+            ('SAVGOL', "Savitzky-Golay", "Local polynomial fit, keeps peaks better than Smooth"),
+            ('BUTTERWORTH', "Butterworth", "Low-pass filter that removes jitter above a cutoff frequency")
+        ],
+        default='SMOOTH'
+    )
+    strength: FloatProperty(
+        name="Strength",
+        description="How much of the filtered result is blended in",
+        default=1.0,
+        min=0.0,
+        max=1.0,
+        subtype='FACTOR'
+    )
+    iterations: IntProperty(
+        name="Iterations",
+        description="Number of smoothing passes",
+        default=1,
+        min=1,
+        max=100
+    )
+    smooth_radius: IntProperty(
+        name="Kernel Width",
+        description="Keyframes on each side averaged by every smoothing pass",
+        default=1,
+        min=1,
+        max=50
+    )
+    window: IntProperty(
+        name="Window",
+        description="Keyframes in each Savitzky-Golay fit, must be odd",
+        default=7,
+        min=3,
+        max=501
+    )
+    polyorder: IntProperty(
+        name="Polynomial Order",
+        description="Order of the Savitzky-Golay polynomial",
+        default=2,
+        min=0,
+        max=10
+    )
+    cutoff: FloatProperty(
+        name="Cutoff (Hz)",
+        description="Butterworth cutoff frequency, keys are assumed to be one frame apart",
+        default=6.0,
+        min=0.01,
+        max=1000.0
+    )
+    filter_order: IntProperty(
+        name="Order",
+        description="Butterworth filter order, higher is a steeper cutoff",
+        default=2,
+        min=1,
+        max=8
+    )
+    noise_type: EnumProperty(
+        name="Noise Type",
+        description="Kind of noise added by the Noise mode",
+        items=[
+            ('WHITE', "White", "An independent random offset on every frame"),
+            ('VALUE', "Value", "Smoothly eased random values"),
+            ('PERLIN', "Perlin", "Coherent gradient noise")
+        ],
+        default='PERLIN'
+    )
+    noise_frequency: FloatProperty(
+        name="Frequency",
+        description="Noise cycles per frame for Value and Perlin noise",
+        default=0.1,
+        min=0.001,
+        max=1.0
+    )
+    noise_amplitude: FloatProperty(
+        name="Amplitude",
+        description="Largest offset the noise adds to a keyframe",
+        default=1.0,
+        min=0.0,
+        max=100.0
+    )
+    noise_seed: IntProperty(
+        name="Seed",
+        description="Seed of the noise, the same seed always gives the same noise",
+        default=0,
+        min=0
+    )
+    use_frame_range: BoolProperty(
+        name="Frame Range",
+        description="Only filter keyframes inside a frame range",
+        default=False
+    )
+    frame_start: IntProperty(name="Start", default=1)
+    frame_end: IntProperty(name="End", default=250)
+    
+    def gather_fcurves(self, context):
+        """Yield the F-Curves to filter one at a time, with the total count"""
+        return gather_scope_fcurves(context, self.scope)
+    
+    def invoke(self, context, event):
+        self.frame_start = context.scene.frame_start
+        self.frame_end = context.scene.frame_end
+        return context.window_manager.invoke_props_dialog(self)
+    
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "scope")
+        layout.prop(self, "filter_mode")
+        layout.prop(self, "strength")
+        if self.filter_mode == 'SMOOTH':
+            layout.prop(self, "iterations")
+            layout.prop(self, "smooth_radius")
+        elif self.filter_mode == 'SAVGOL':
+            layout.prop(self, "window")
+            layout.prop(self, "polyorder")
+        elif self.filter_mode == 'BUTTERWORTH':
+            layout.prop(self, "cutoff")
+            layout.prop(self, "filter_order")
+        elif self.filter_mode == 'NOISE':
+            layout.prop(self, "noise_type")
+            if self.noise_type != 'WHITE':
+                layout.prop(self, "noise_frequency")
+            layout.prop(self, "noise_amplitude")
+            layout.prop(self, "noise_seed")
+        layout.prop(self, "use_frame_range")
+        if self.use_frame_range:
+            row = layout.row(align=True)
+            row.prop(self, "frame_start")
+            row.prop(self, "frame_end")
+    
+    def execute(self, context):
+        from .brush_engine import filter_fcurve
+        if self.filter_mode == 'SAVGOL' and (self.window % 2 == 0 or self.polyorder >= self.window):
+            self.report({'ERROR'}, "Savitzky-Golay needs an odd window larger than the order")
+            return {'CANCELLED'}
+        
+        scene = context.scene
+        fps = scene.render.fps / scene.render.fps_base
+        frame_range = (self.frame_start, self.frame_end) if self.use_frame_range else None
+        options = dict(
+            strength=self.strength,
+            iterations=self.iterations,
+            radius=self.smooth_radius,
+            window=self.window,
+            order=self.polyorder if self.filter_mode == 'SAVGOL' else self.filter_order,
+            # Cycles per key, for keys one frame apart
+            cutoff=self.cutoff / fps,
+            noise_type=self.noise_type,
+            frequency=self.noise_frequency,
+            amplitude=self.noise_amplitude,
+            seed=self.noise_seed,
+        )
+        
+        total, fcurves = self.gather_fcurves(context)
+        if not total:
+            self.report({'WARNING'}, "No F-Curves to filter")
+            return {'CANCELLED'}
+        
+        # Curves are streamed one by one, nothing is kept between them
+        wm = context.window_manager
+        wm.progress_begin(0, total)
+        curves = keys = 0
+        try:
+            for i, fcurve in enumerate(fcurves):
+                if not fcurve.lock:
+                    changed = filter_fcurve(fcurve, self.filter_mode, frame_range, **options)
+                    if changed:
+                        curves += 1
+                        keys += changed
+                wm.progress_update(i + 1)
+        finally:
+            wm.progress_end()
+        
+        self.report({'INFO'}, f"Filtered {keys} keyframes on {curves} F-Curves")
+        return {'FINISHED'}
+
+class FCurveReplayStrokeOperator(bpy.types.Operator):
+    """Apply a recorded brush stroke to F-Curves without painting"""
+    bl_idname = "graph.fcurve_replay_stroke"
+    bl_label = "Replay Brush Stroke"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    filepath: StringProperty(subtype='FILE_PATH')
+    filter_glob: StringProperty(default="*.npz", options={'HIDDEN'})
+    scope: EnumProperty(
+        name="Curves",
+        description="Which F-Curves to apply the stroke to",
+        items=SCOPE_ITEMS,
+        default='SELECTED'
+    )
+    single_pass: BoolProperty(
+        name="Single Pass",
+        description="Apply all dabs at once instead of in the batches they were painted in",
+        default=True
+    )
+    
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+    
+    def execute(self, context):
+        from .brush_engine import StrokeRecording, replay_stroke
+        try:
+            recording = StrokeRecording.load(bpy.path.abspath(self.filepath))
+        except (OSError, ValueError, KeyError) as error:
+            self.report({'ERROR'}, f"Could not load stroke recording: {error}")
+            return {'CANCELLED'}
+        
+        _total, fcurves = gather_scope_fcurves(context, self.scope)
+        fcurves = [fc for fc in fcurves if not fc.lock]
+        if not fcurves:
+            self.report({'WARNING'}, "No F-Curves to apply the stroke to")
+            return {'CANCELLED'}
+        
+        record = replay_stroke(recording, fcurves, single_pass=self.single_pass)
+        curves = len(record.deltas) if record is not None else 0
+        self.report({'INFO'}, f"Replayed {len(recording)} dabs on {curves} F-Curves")
+        return {'FINISHED'}
+
+class FCurveSmoothBrushPanel(bpy.types.Panel):
+    bl_label = "FCurve Smooth Brush"
+    bl_idname = "GRAPH_PT_fcurve_smooth_brush"
+    bl_space_type = 'GRAPH_EDITOR'
+    bl_region_type = 'UI'
+    bl_category = 'Tool'
+    
+    def draw(self, context):
+        layout = self.layout
+        props = context.scene.fcurve_smooth_brush
+        
+        # Main brush controls
+        row = layout.row(align=True)
+        if not props.is_active:
+            row.operator("graph.fcurve_smooth_brush", text="Start Brush", icon='BRUSH_DATA')
+        else:
+            row.label(text="Brush Active", icon='RADIOBUT_ON')
+            row.prop(props, "is_active", text="", icon='X')
+        layout.operator("graph.fcurve_batch_filter", text="Batch Filter...", icon='MODIFIER')
+        layout.operator("graph.fcurve_replay_stroke", text="Replay Stroke...", icon='FILE_MOVIE')
+        
+        # Brush settings
+        col = layout.column(align=True)
+        col.prop(props, "brush_mode", text="Mode")
+        col.prop(props, "brush_size", text="Size")
+        col.prop(props, "strength", text="Strength")
+        col.prop(props, "falloff_type", text="Falloff")
+        if props.falloff_type == 'CUSTOM':
+            node = falloff_curve_node()
+            if node is not None:
+                col.template_curve_mapping(node, "mapping")
+        col.prop(props, "spacing", text="Spacing")
+        if props.brush_mode == 'SMOOTH':
+            col.prop(props, "iterations", text="Iterations")
+            col.prop(props, "smooth_radius", text="Kernel Width")
+        if props.brush_mode == 'FLATTEN':
+            col.prop(props, "flatten_target", text="Target")
+            if props.flatten_target == 'WINDOW':
+                col.prop(props, "flatten_window", text="Window")
+        if props.brush_mode == 'NOISE':
+            col.prop(props, "noise_type", text="Noise")
+            if props.noise_type != 'WHITE':
+                col.prop(props, "noise_frequency", text="Frequency")
+            col.prop(props, "noise_amplitude", text="Amplitude")
+            col.prop(props, "noise_seed", text="Seed")
+        if props.brush_mode == 'DECIMATE':
+            col.prop(props, "decimate_error", text="Tolerance")
+        
+        # Selection options
+        box = layout.box()
+        col = box.column()
+        col.prop(props, "affect_selected", text="Selected Only")
+        col.prop(props, "select_while_painting", text="Auto-Select")
+        
+        # Advanced options
+        box = layout.box()
+        box.label(text="Advanced")
+        col = box.column()
+        col.prop(props, "auto_frame", text="Auto Frame")
+        if props.auto_frame:
+            col.prop(props, "auto_frame_margin", text="Margin")
+            col.prop(props, "auto_frame_interval", text="Interval")
+            col.prop(props, "auto_frame_on_release", text="Frame on Release")
+        col.prop(props, "preserve_handles", text="Preserve Handles")
+        col.prop(props, "defer_update", text="Deferred Update")
+        col.prop(props, "use_async", text="Background Compute")
+        col.prop(props, "use_threads", text="Multi-threaded")
+        if props.use_threads:
+            col.prop(props, "thread_min_curves", text="Threshold")
+            col.prop(props, "thread_count", text="Threads")
+        col.prop(props, "undo_memory", text="Undo Memory (MB)")
+        col.prop(props, "cache_memory", text="Cache Memory (MB)")
+        col.prop(props, "show_stats", text="Show Performance Stats")
+        col.prop(props, "stats_log_path", text="Stats Log")
+        col.prop(props, "record_strokes", text="Record Strokes")
+        if props.record_strokes:
+            col.prop(props, "record_dir", text="Folder")
+
+# Registration
+classes = (
+    FCurveSmoothBrushProperties,
+    FCurveSmoothBrushOperator,
+    FCurveBatchFilterOperator,
+    FCurveReplayStrokeOperator,
+    FCurveSmoothBrushPanel
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    bpy.types.Scene.fcurve_smooth_brush = bpy.props.PointerProperty(type=FCurveSmoothBrushProperties)
+
+def unregister():
+    _draw_cache.clear()
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
+    del bpy.types.Scene.fcurve_smooth_brush
+
+if __name__ == "__main__":
+    register()
@@ -0,0 +1,22 @@
+"""Blender-independent core of the FCurve Smooth Brush
+
+Only depends on NumPy so it can be imported and exercised outside Blender.
+"""
+
+from .async_stroke import SETTING_NAMES, AsyncStroke, snapshot_settings
+from .bounds import CurveBounds, intersect_ranges, visible_rect
+from .brush import BRUSH_MODES, BrushEngine, DabBatch, KeyRemoval
+from .cache import KeyframeCache, refresh_arrays
+from .falloff import FALLOFF_TYPES, FalloffTable, falloff_profile, falloff_table
+from .filters import FILTER_MODES, butterworth, filter_arrays, filter_fcurve, savitzky_golay
+from .framing import frame_view, keys_bounds, union_bounds
+from .hit_test import BrushFootprint, brush_footprint, combine_hits, footprints_range
+from .keyframe_io import (CurveArrays, read_curve, read_key_attributes, rebuild_curve, remove_keys,
+                          write_curve)
+from .kernels import MODE_KERNELS, FlattenTarget, apply_mode
+from .noise import NOISE_TYPES, curve_seed, noise_field
+from .profiling import BrushStats
+from .recording import RecordedView, StrokeRecording, replay_stroke
+from .stroke import StrokeSpacer
+from .time_index import FrameIndex, curve_key, frame_index
+from .undo import CurveDelta, StrokeRecord, StrokeRecorder, UndoHistory
@@ -0,0 +1,106 @@
+"""Brush kernels computed off the main thread
+
+AsyncStroke keeps at most one batch of dabs computing on a worker thread.
+Dabs that arrive meanwhile are queued and coalesced into the next batch,
+and past ``max_dabs`` only the newest are kept, so a slow kernel makes
+the brush lag behind the cursor by one batch instead of an ever growing
+queue. Reading and writing curves stays on the calling (main) thread:
+``step()`` is meant to be polled, from a timer inside Blender.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+# Every brush setting the engine reads while processing a batch
+SETTING_NAMES = (
+    "brush_mode", "brush_size", "strength", "falloff_type", "iterations", "smooth_radius",
+    "flatten_target", "flatten_window", "noise_type", "noise_frequency",
+    "noise_amplitude", "noise_seed", "decimate_error", "affect_selected", "select_while_painting",
+    "auto_frame", "preserve_handles", "defer_update",
+    "use_threads", "thread_min_curves", "thread_count",
+)
+
+
+def snapshot_settings(settings):
+    """Plain copy of the brush settings, safe to read from any thread"""
+    return SimpleNamespace(**{name: getattr(settings, name) for name in SETTING_NAMES})
+
+
+class AsyncStroke:
+    """Latest-wins dab queue feeding a BrushEngine from a worker thread"""
+
+    def __init__(self, engine, max_dabs=64):
+        self.engine = engine
+        self.max_dabs = max_dabs
+        self.pending = []
+        self.dropped = 0
+        self._future = None
+        self._executor = None
+
+    @property
+    def busy(self):
+        """Whether a batch is computing or waiting to be committed"""
+        return self._future is not None
+
+    def queue(self, dabs):
+        """Add dab positions, dropping the oldest past ``max_dabs``"""
+        self.pending.extend(dabs)
+        excess = len(self.pending) - self.max_dabs
+        if self.max_dabs > 0 and excess > 0:
+            del self.pending[:excess]
+            self.dropped += excess
+
+    def step(self, view, region_size, settings):
+        """Commit a finished batch and start the next one, without blocking
+
+        Returns the number of curves changed by the committed batch.
+        """
+        changed = 0
+        if self._future is not None:
+            if not self._future.done():
+                return 0
+            batch = self._future.result()
+            self._future = None
+            changed = self.engine.commit(batch)
+
+        if self.pending:
+            dabs = self.pending
+            self.pending = []
+            settings = snapshot_settings(settings)
+            batch = self.engine.gather(view, region_size, dabs, settings)
+            if batch is not None:
+                self._future = self.executor().submit(self.engine.compute, batch)
+        return changed
+
+    def flush(self, view, region_size, settings):
+        """Finish the batch in flight and everything still queued"""
+        changed = 0
+        if self._future is not None:
+            batch = self._future.result()
+            self._future = None
+            changed = self.engine.commit(batch)
+        if self.pending:
+            dabs = self.pending
+            self.pending = []
+            changed += self.engine.apply_dabs(view, region_size, dabs, settings)
+        return changed
+
+    def executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fcurve_brush_async")
+        return self._executor
+
+    def cancel(self):
+        """Drop queued dabs and wait for the batch in flight without committing it"""
+        self.pending = []
+        if self._future is not None:
+            self._future.result()
+            self._future = None
+            # Its cached arrays were edited but never written
+            self.engine.invalidate()
+
+    def shutdown(self):
+        self.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,128 @@
+"""Per-curve bounding boxes for culling whole channels
+
+Holds the frame and value extents of every candidate curve in one array,
+so a dab can reject all curves that are off-screen or out of the brush's
+reach with a single vectorized comparison before any keyframe is read.
+"""
+
+import numpy as np
+
+FRAME_MIN, FRAME_MAX, VALUE_MIN, VALUE_MAX = range(4)
+
+
+def intersect_ranges(a, b):
+    """Overlap of two (low, high) ranges, or None if they are disjoint"""
+    low = max(a[0], b[0])
+    high = min(a[1], b[1])
+    if low > high:
+        return None
+    return low, high
+
+
+def visible_rect(view, width, height):
+    """Frame and value ranges shown by a View2D over a region of the given size"""
+    frame_lo, value_lo = view.region_to_view(0, 0)
+    frame_hi, value_hi = view.region_to_view(width, height)
+    return ((min(frame_lo, frame_hi), max(frame_lo, frame_hi)),
+            (min(value_lo, value_hi), max(value_lo, value_hi)))
+
+
+class CurveBounds:
+    """Cached extents of curves, keyed like the frame index
+
+    Entries only change through ``set``, ``widen`` and ``discard``; the owner is
+    responsible for invalidating them when curves are edited outside the
+    brush (the operator clears them at the start of every stroke and after
+    undo).
+    """
+
+    def __init__(self, capacity=64):
+        self._rows = {}
+        self._free = []
+        self._data = np.empty((capacity, 4), dtype=np.float64)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    def clear(self):
+        self._rows.clear()
+        self._free.clear()
+
+    def _row_for(self, key):
+        row = self._rows.get(key)
+        if row is not None:
+            return row
+        if self._free:
+            row = self._free.pop()
+        else:
+            row = len(self._rows)
+            if row >= len(self._data):
+                grown = np.empty((len(self._data) * 2, 4), dtype=np.float64)
+                grown[:len(self._data)] = self._data
+                self._data = grown
+        self._rows[key] = row
+        return row
+
+    def set(self, key, times, values):
+        """Store the extents of a curve from its key arrays"""
+        row = self._row_for(key)
+        if len(times):
+            self._data[row] = (times.min(), times.max(), values.min(), values.max())
+        else:
+            # An empty curve can never be hit
+            self._data[row] = (np.inf, -np.inf, np.inf, -np.inf)
+
+    def widen(self, key, co):
+        """Grow a known curve's box to take in (n, 2) edited key coordinates
+
+        Cheaper than ``set`` after an edit that only moved some keys; the
+        box may end up larger than the curve, which is still safe for culling.
+        """
+        row = self._rows.get(key)
+        if row is None or not len(co):
+            return
+        low = co.min(axis=0)
+        high = co.max(axis=0)
+        box = self._data[row]
+        box[FRAME_MIN] = min(box[FRAME_MIN], low[0])
+        box[FRAME_MAX] = max(box[FRAME_MAX], high[0])
+        box[VALUE_MIN] = min(box[VALUE_MIN], low[1])
+        box[VALUE_MAX] = max(box[VALUE_MAX], high[1])
+
+    def get(self, key):
+        row = self._rows.get(key)
+        if row is None:
+            return None
+        return tuple(self._data[row])
+
+    def discard(self, key):
+        row = self._rows.pop(key, None)
+        if row is not None:
+            self._free.append(row)
+
+    def overlaps(self, key, frame_range, value_range):
+        """Whether a known curve's box meets the rectangle, True if unknown"""
+        row = self._rows.get(key)
+        if row is None:
+            return True
+        box = self._data[row]
+        return (box[FRAME_MIN] <= frame_range[1] and box[FRAME_MAX] >= frame_range[0]
+                and box[VALUE_MIN] <= value_range[1] and box[VALUE_MAX] >= value_range[0])
+
+    def select(self, keys, frame_range, value_range):
+        """Positions in ``keys`` whose curves may intersect the rectangle
+
+        Curves without cached bounds are always included so they get read
+        (and measured) once.
+        """
+        rows = np.fromiter((self._rows.get(k, -1) for k in keys), dtype=np.intp, count=len(keys))
+        known = rows >= 0
+        boxes = self._data[rows[known]]
+        hit = ((boxes[:, FRAME_MIN] <= frame_range[1]) & (boxes[:, FRAME_MAX] >= frame_range[0])
+               & (boxes[:, VALUE_MIN] <= value_range[1]) & (boxes[:, VALUE_MAX] >= value_range[0]))
+        keep = ~known
+        keep[known] = hit
+        return np.flatnonzero(keep)
@@ -0,0 +1,408 @@
+"""The per-dab brush pipeline
+
+BrushEngine owns everything that lives between dabs (frame indices, curve
+bounds, flatten targets, the undo recorder and the stats) and applies
+batches of dabs to a set of curves. It only talks to curves, the View2D
+and the brush settings through the small duck-typed surface the stand-ins
+in ``mock`` implement, so the same code runs inside Blender and headless.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .bounds import CurveBounds, intersect_ranges, visible_rect
+from .cache import KeyframeCache
+from .falloff import falloff_table
+from .framing import keys_bounds, union_bounds
+from .hit_test import brush_footprint, combine_hits, footprints_range
+from .keyframe_io import remove_keys, write_curve
+from .kernels import MODE_KERNELS, TIME_AXIS, FlattenTarget, apply_mode, decimate
+from .noise import curve_seed, noise_field
+from .profiling import BrushStats
+from .time_index import curve_key, frame_index
+from .undo import StrokeRecorder
+
+
+# Kernel modes plus the modes the engine handles itself
+BRUSH_MODES = tuple(MODE_KERNELS) + ('DECIMATE',)
+
+
+class KeyRemoval:
+    """Result of a mode that deletes keys instead of moving them"""
+
+    __slots__ = ("indices",)
+
+    def __init__(self, indices):
+        self.indices = indices
+
+
+def move_handles_with_keys(arrays, indices, before):
+    """Translate the handles of keys at ``indices`` by how far the keys moved
+
+    This keeps FREE and ALIGNED handles in shape. AUTO and AUTO_CLAMPED
+    handles, of these keys and of their neighbours, only follow once the
+    curve's update() runs: after the dab, or when the stroke ends if
+    updates are deferred.
+    """
+    delta = arrays.co[indices] - before
+    arrays.handle_left[indices] += delta
+    arrays.handle_right[indices] += delta
+    arrays.mark_indices_dirty('handle_left', indices)
+    arrays.mark_indices_dirty('handle_right', indices)
+
+
+class DabBatch:
+    """The per-curve jobs of one batch of dabs, between gather and commit"""
+
+    __slots__ = ("jobs", "settings", "axes")
+
+    def __init__(self, jobs, settings):
+        # (fcurve, key, arrays, indices, factors, before) per curve
+        self.jobs = jobs
+        self.settings = settings
+        # Edited co axis per job, set by BrushEngine.compute
+        self.axes = None
+
+    def __len__(self):
+        return len(self.jobs)
+
+
+class BrushEngine:
+    """Applies brush dabs to the curves of a stroke"""
+
+    def __init__(self):
+        self.frame_indices = {}
+        self.curve_bounds = CurveBounds()
+        self.keyframe_cache = KeyframeCache()
+        self.flatten_targets = {}
+        # key -> (n, 2) float64 co of the curve when the stroke first touched it
+        self.stroke_start = {}
+        # key -> noise value of every key of the curve
+        self.noise_tables = {}
+        self.recorder = StrokeRecorder()
+        self.stats = BrushStats()
+        self.curves = []
+        self.keys = []
+        # key -> fcurve changed during the stroke whose update() was deferred
+        self.deferred_updates = {}
+        # StrokeRecording that every gathered batch is appended to, or None
+        self.capture = None
+        # (frame_min, frame_max, value_min, value_max) of the keys moved by
+        # the last committed batch and by the whole stroke, with auto_frame on
+        self.edited_bounds = None
+        self.stroke_bounds = None
+        # FalloffTable of the last falloff setting used, and the samples a
+        # CUSTOM falloff is baked from (centre to rim)
+        self.falloff = None
+        self.custom_falloff = None
+        self._executor = None
+        self._executor_workers = 0
+
+    def clear(self):
+        """Drop all cached data"""
+        self.shutdown()
+        self.frame_indices.clear()
+        self.curve_bounds.clear()
+        self.keyframe_cache.clear()
+        self.flatten_targets.clear()
+        self.stroke_start.clear()
+        self.noise_tables.clear()
+        self.deferred_updates.clear()
+        self.curves = []
+        self.keys = []
+
+    def shutdown(self):
+        """Stop the worker pool, if one was started"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            self._executor_workers = 0
+
+    def executor(self, workers):
+        """Return a worker pool with ``workers`` threads (0 for one per core)"""
+        workers = workers or os.cpu_count() or 1
+        if self._executor is None or self._executor_workers != workers:
+            self.shutdown()
+            self._executor = ThreadPoolExecutor(max_workers=workers,
+                                                thread_name_prefix="fcurve_brush")
+            self._executor_workers = workers
+        return self._executor
+
+    def invalidate(self):
+        """Forget cached arrays, extents and frames after curves changed elsewhere"""
+        self.curve_bounds.clear()
+        self.frame_indices.clear()
+        self.keyframe_cache.clear()
+
+    def begin_stroke(self, curves, stats_enabled=False):
+        """Start a stroke over ``curves``, which can't change until it ends"""
+        self.curves = [fc for fc in curves if not fc.hide and len(fc.keyframe_points)]
+        self.keys = [curve_key(fc) for fc in self.curves]
+        self.flatten_targets.clear()
+        self.stroke_start.clear()
+        self.noise_tables.clear()
+        self.deferred_updates.clear()
+        self.edited_bounds = None
+        self.stroke_bounds = None
+        # Curves may have been edited since the last stroke
+        self.curve_bounds.clear()
+        self.keyframe_cache.begin_stroke()
+        self.recorder = StrokeRecorder()
+        self.stats.enabled = stats_enabled
+        self.stats.reset()
+
+    def end_stroke(self):
+        """Finish the stroke, returning its undo record (or None)
+
+        Runs the update() calls deferred during the stroke first, so the
+        record holds the recalculated handles.
+        """
+        self.flush_updates()
+        return self.recorder.finish()
+
+    def flush_updates(self):
+        """Recalculate every curve whose update() was deferred"""
+        with self.stats.stage('update'):
+            for key, fcurve in self.deferred_updates.items():
+                fcurve.update()
+                self.keyframe_cache.refresh_handles(key, fcurve)
+        self.deferred_updates.clear()
+
+    def prepare(self, arrays, key, settings):
+        """Build per-stroke mode state for a curve, on the calling thread"""
+        mode = settings.brush_mode
+        if mode == 'FLATTEN' and key not in self.flatten_targets:
+            # Targets come from the values the curve had when the stroke first touched it
+            self.flatten_targets[key] = FlattenTarget(arrays.values)
+        elif mode in ('RELATIVE', 'NOISE', 'DECIMATE') and key not in self.stroke_start:
+            self.stroke_start[key] = arrays.co.astype(np.float64)
+            if mode == 'NOISE':
+                self.noise_tables[key] = noise_field(
+                    arrays.times, settings.noise_type, settings.noise_frequency,
+                    curve_seed(settings.noise_seed, key))
+
+    def process(self, arrays, indices, factors, key, settings):
+        """Apply the brush mode to the keys at indices, returns the edited co axis
+
+        Modes that delete keys return a KeyRemoval instead. Only reads state
+        made by ``prepare`` so it is safe to run on a worker thread.
+        """
+        mode = settings.brush_mode
+        if mode == 'FLATTEN':
+            target = self.flatten_targets[key]
+            return apply_mode(mode, arrays.co, indices, factors,
+                              target=target.targets(indices, settings.flatten_target,
+                                                    settings.flatten_window))
+        if mode == 'SMOOTH':
+            return apply_mode(mode, arrays.co, indices, factors,
+                              iterations=settings.iterations, radius=settings.smooth_radius)
+        if mode == 'RELATIVE':
+            return apply_mode(mode, arrays.co, indices, factors,
+                              original=self.stroke_start[key][:, 1])
+        if mode == 'NOISE':
+            return apply_mode(mode, arrays.co, indices, factors,
+                              original=self.stroke_start[key][:, 1], table=self.noise_tables[key],
+                              amplitude=settings.noise_amplitude)
+        if mode == 'DECIMATE':
+            return KeyRemoval(decimate(arrays.values, arrays.times, indices, factors,
+                                       original=self.stroke_start[key],
+                                       tolerance=settings.decimate_error))
+        return apply_mode(mode, arrays.co, indices, factors)
+
+    def run_jobs(self, jobs, settings):
+        """Run ``process`` for every (fcurve, key, arrays, indices, factors, before) job
+
+        Curves are independent, so with ``use_threads`` enabled and at least
+        ``thread_min_curves`` jobs the kernels run on the worker pool (NumPy
+        releases the GIL). Returns the edited axis of each job, in order.
+        """
+        def run(job):
+            fcurve, key, arrays, indices, factors, before = job
+            return self.process(arrays, indices, factors, key, settings)
+
+        threaded = settings.use_threads and len(jobs) >= max(settings.thread_min_curves, 2)
+        if not threaded:
+            return [run(job) for job in jobs]
+        return list(self.executor(settings.thread_count).map(run, jobs))
+
+    def apply_dabs(self, view, region_size, dabs, settings):
+        """Apply a batch of dabs at region positions, one pass per curve
+
+        ``region_size`` is the (width, height) of the region ``view``
+        belongs to. Returns the number of curves changed.
+        """
+        batch = self.gather(view, region_size, dabs, settings)
+        if batch is None:
+            return 0
+        return self.commit(self.compute(batch))
+
+    def gather(self, view, region_size, dabs, settings):
+        """Read and hit test the curves under a batch of dabs
+
+        First phase of ``apply_dabs``, it reads curves so it must run on the
+        main thread. Returns a DabBatch, or None when no key is reachable.
+        """
+        stats = self.stats
+        stats.add('dabs', len(dabs))
+        stats.add('batches')
+        if not len(dabs):
+            return None
+        falloff_type = getattr(settings, 'falloff_type', 'SMOOTH')
+        if self.capture is not None:
+            self.capture.add(view, region_size, dabs, settings)
+            if falloff_type == 'CUSTOM':
+                self.capture.falloff_curve = self.custom_falloff
+
+        brush_size = settings.brush_size
+        strength = settings.strength
+        # Baked again only when the falloff setting changed
+        falloff = self.falloff = falloff_table(falloff_type, self.custom_falloff, self.falloff)
+        defer_update = settings.defer_update
+        # Without a per-dab update() handles must follow their keys or the
+        # curve is drawn wrong until the stroke ends
+        move_handles = settings.preserve_handles or defer_update
+
+        # Map the brush circle into view space once per dab
+        footprints = [brush_footprint(view, x, y, brush_size) for x, y in dabs]
+        brush_frames, brush_values = footprints_range(footprints)
+
+        # Only the part of the brush inside the visible region can touch keys
+        view_frames, view_values = visible_rect(view, *region_size)
+        frame_range = intersect_ranges(brush_frames, view_frames)
+        value_range = intersect_ranges(brush_values, view_values)
+        if frame_range is None or value_range is None:
+            return None
+        dab_frames = [intersect_ranges(fp.frame_range, view_frames) for fp in footprints]
+
+        # Cull whole channels whose extents miss the brush rectangle
+        candidates = self.curve_bounds.select(self.keys, frame_range, value_range)
+
+        # Gather keys and hit test on this thread, kernels may run in parallel
+        jobs = []
+        for position in candidates.tolist():
+            fcurve = self.curves[position]
+            key = self.keys[position]
+
+            # One bulk read per curve instead of per-keyframe RNA access,
+            # none at all for curves nothing else has touched since
+            with stats.stage('gather'):
+                arrays = self.keyframe_cache.get(key, fcurve)
+            stats.add('curves_visited')
+            times = arrays.times
+            values = arrays.values
+
+            if key not in self.curve_bounds:
+                self.curve_bounds.set(key, times, values)
+                if not self.curve_bounds.overlaps(key, frame_range, value_range):
+                    continue
+
+            # Only the run of keys inside each dab's frame interval can be hit
+            with stats.stage('hit_test'):
+                index = frame_index(self.frame_indices, key, times)
+                windows = [index.window(*frames) if frames else (0, 0) for frames in dab_frames]
+
+                # Elliptical distance test and falloff of all dabs, combined per key
+                indices, factors = combine_hits(times, values, footprints, windows, strength, falloff)
+            if stats.enabled:
+                stats.add('keys_tested', sum(stop - start for start, stop in windows))
+
+            if settings.affect_selected:
+                keep = arrays.select[indices]
+                indices, factors = indices[keep], factors[keep]
+
+            if not len(indices):
+                continue
+
+            removing = settings.brush_mode == 'DECIMATE'
+            self.recorder.touch(key, fcurve, indices, arrays, resize=removing)
+            stats.add('keys_modified', len(indices))
+            self.prepare(arrays, key, settings)
+            before = arrays.co[indices] if move_handles and not removing else None
+            jobs.append((fcurve, key, arrays, indices, factors, before))
+
+        return DabBatch(jobs, settings) if jobs else None
+
+    def compute(self, batch):
+        """Run the kernels of a DabBatch, returning it
+
+        Only touches the batch's arrays, never RNA, so it may run on any
+        thread while the main thread is free, as long as no other batch
+        of the same engine is gathered or committed meanwhile.
+        """
+        # Apply the brush effect to all keys under it at once, curve by curve
+        with self.stats.stage('kernel'):
+            batch.axes = self.run_jobs(batch.jobs, batch.settings)
+        return batch
+
+    def commit(self, batch):
+        """Write a computed DabBatch back to its curves, on the main thread
+
+        Returns the number of curves changed.
+        """
+        stats = self.stats
+        settings = batch.settings
+        defer_update = settings.defer_update
+        track_bounds = getattr(settings, 'auto_frame', False)
+        edited = None
+        changed = 0
+        for (fcurve, key, arrays, indices, factors, before), axis in zip(batch.jobs, batch.axes):
+            if isinstance(axis, KeyRemoval):
+                changed += self.commit_removal(fcurve, key, arrays, axis.indices, defer_update)
+                continue
+            # Bookkeeping between the kernel and the write
+            with stats.stage('commit'):
+                if axis is not None:
+                    arrays.mark_indices_dirty('co', indices)
+                    if before is not None:
+                        move_handles_with_keys(arrays, indices, before)
+                    if track_bounds:
+                        edited = union_bounds(edited, keys_bounds(arrays, indices))
+                    if axis == TIME_AXIS:
+                        # Keys moved in time, rebuild the frame index on next use
+                        self.frame_indices.pop(key, None)
+                        self.curve_bounds.set(key, arrays.times, arrays.values)
+                    else:
+                        # Only the brushed keys moved, a wider box stays conservative
+                        self.curve_bounds.widen(key, arrays.co[indices])
+
+                if settings.select_while_painting:
+                    arrays.select[indices] = True
+                    arrays.mark_indices_dirty('select_control_point', indices)
+
+            with stats.stage('write'):
+                written = write_curve(fcurve, arrays)
+            if written:
+                if defer_update:
+                    self.deferred_updates[key] = fcurve
+                else:
+                    with stats.stage('update'):
+                        fcurve.update()
+                        self.keyframe_cache.refresh_handles(key, fcurve)
+                changed += 1
+            elif axis is not None:
+                # The write was refused, the cached arrays no longer match the curve
+                self.keyframe_cache.discard(key)
+
+        self.edited_bounds = edited
+        self.stroke_bounds = union_bounds(self.stroke_bounds, edited)
+        return changed
+
+    def commit_removal(self, fcurve, key, arrays, remove, defer_update):
+        """Delete keys of one curve and drop everything cached about its old layout"""
+        if not len(remove):
+            return 0
+        stats = self.stats
+        with stats.stage('write'):
+            remaining = remove_keys(fcurve, arrays, remove)
+        stats.add('keys_removed', len(remove))
+        self.keyframe_cache.discard(key)
+        self.frame_indices.pop(key, None)
+        self.curve_bounds.set(key, remaining.times, remaining.values)
+        if defer_update:
+            self.deferred_updates[key] = fcurve
+        else:
+            with stats.stage('update'):
+                fcurve.update()
+        return 1
@@ -0,0 +1,114 @@
+"""Keyframe arrays cached between dabs and strokes
+
+Reading a dense curve from RNA every dab costs a bulk copy per attribute
+even when nothing but the brush has touched it. KeyframeCache keeps the
+CurveArrays of recently brushed curves, least recently used first out
+once they pass a byte budget. Within a stroke the brush is the only
+editor, its writes go through the cached arrays and no read is needed.
+The first time a curve is used in each stroke its arrays are refreshed
+in place with one bulk read per attribute, so edits made elsewhere
+between strokes, to any key, are never written over.
+"""
+
+from collections import OrderedDict
+
+from .keyframe_io import VECTOR_ATTRS, read_curve
+
+
+class _Entry:
+    __slots__ = ("arrays", "stroke", "nbytes")
+
+    def __init__(self, arrays, stroke):
+        self.arrays = arrays
+        self.stroke = stroke
+        self.nbytes = sum(getattr(arrays, attr).nbytes for attr in VECTOR_ATTRS) \
+            + arrays.select.nbytes
+
+
+def refresh_arrays(fcurve, arrays):
+    """Re-read a curve into its arrays in place, False if the key count changed"""
+    points = fcurve.keyframe_points
+    if len(points) != len(arrays):
+        return False
+    for attr in VECTOR_ATTRS:
+        points.foreach_get(attr, getattr(arrays, attr).ravel())
+    points.foreach_get("select_control_point", arrays.select)
+    arrays.dirty.clear()
+    return True
+
+
+class KeyframeCache:
+    """Per-curve CurveArrays with LRU eviction under ``budget_bytes``
+
+    Entries always hold handles and selection, so any read can be served.
+    """
+
+    def __init__(self, budget_bytes=256 * 1024 * 1024):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._stroke = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    def begin_stroke(self):
+        """Make every entry refresh from its curve on first use"""
+        self._stroke += 1
+
+    def get(self, key, fcurve):
+        """CurveArrays of ``fcurve``, from the cache when it has the same key count"""
+        entry = self._entries.get(key)
+        if entry is not None and entry.stroke != self._stroke:
+            if refresh_arrays(fcurve, entry.arrays):
+                entry.stroke = self._stroke
+            else:
+                self.discard(key)
+                entry = None
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.arrays
+
+        self.misses += 1
+        arrays = read_curve(fcurve)
+        entry = self._entries[key] = _Entry(arrays, self._stroke)
+        self._nbytes += entry.nbytes
+        self.trim()
+        return arrays
+
+    def refresh_handles(self, key, fcurve):
+        """Re-read handles after ``fcurve.update()`` recalculated them"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        arrays = entry.arrays
+        if len(fcurve.keyframe_points) != len(arrays):
+            self.discard(key)
+            return
+        fcurve.keyframe_points.foreach_get("handle_left", arrays.handle_left.ravel())
+        fcurve.keyframe_points.foreach_get("handle_right", arrays.handle_right.ravel())
+
+    def discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._nbytes -= entry.nbytes
+
+    def trim(self):
+        """Evict least recently used curves until under budget, keeping the newest"""
+        while self._nbytes > self.budget_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self._nbytes -= entry.nbytes
+
+    def clear(self):
+        self._entries.clear()
+        self._nbytes = 0
@@ -0,0 +1,135 @@
+"""Whole-curve filters for batch processing
+
+Applies the brush kernels, or Savitzky-Golay and Butterworth low-pass
+filters, to every key of a curve inside a frame range with one bulk read
+and write per curve. Keys are treated as evenly spaced samples by the
+frequency-domain filters, which holds for baked and mocap curves.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from .brush import move_handles_with_keys
+from .keyframe_io import read_curve, write_curve
+from .kernels import FlattenTarget, apply_mode, odd_extended
+from .noise import curve_seed, noise_field
+from .time_index import curve_key
+
+FILTER_MODES = ('SMOOTH', 'SHARPEN', 'FLATTEN', 'NOISE', 'SAVGOL', 'BUTTERWORTH')
+
+
+@lru_cache(maxsize=32)
+def savgol_coefficients(window, order):
+    """Convolution weights of a Savitzky-Golay smoothing filter"""
+    if window % 2 == 0 or window < 3:
+        raise ValueError("Savitzky-Golay window must be an odd number of at least 3 keys")
+    if order >= window:
+        raise ValueError("Savitzky-Golay order must be smaller than the window")
+    half = window // 2
+    offsets = np.arange(-half, half + 1, dtype=np.float64)
+    vandermonde = offsets[:, None] ** np.arange(order + 1)
+    # Row 0 of the pseudo-inverse evaluates the fitted polynomial at the centre
+    weights = np.linalg.pinv(vandermonde)[0][::-1].copy()
+    weights.flags.writeable = False
+    return weights
+
+
+def savitzky_golay(values, window=7, order=2):
+    """Fit a local polynomial around every key, preserving peaks better than a box"""
+    values = np.asarray(values, dtype=np.float64)
+    window = min(window, len(values) - (1 - len(values) % 2))
+    if window < 3 or order >= window:
+        return values.copy()
+    weights = savgol_coefficients(window, order)
+    half = window // 2
+    segment = odd_extended(values, -half, len(values) + half)
+    return np.convolve(segment, weights, mode='valid')
+
+
+def butterworth(values, cutoff, order=2):
+    """Zero-phase Butterworth low-pass applied in the frequency domain
+
+    ``cutoff`` is in cycles per key (0 to 0.5). The gain is the squared
+    Butterworth magnitude, the response of a forward-backward (filtfilt)
+    pass, so the curve is not shifted in time. The ends are padded by odd
+    reflection to avoid wrap-around ringing.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    count = len(values)
+    if count < 3 or cutoff >= 0.5:
+        return values.copy()
+    cutoff = max(cutoff, 1e-6)
+    pad = min(count - 1, max(int(3.0 / cutoff), 8))
+    segment = odd_extended(values, -pad, count + pad)
+    spectrum = np.fft.rfft(segment)
+    frequencies = np.fft.rfftfreq(len(segment))
+    spectrum *= 1.0 / (1.0 + (frequencies / cutoff) ** (2 * order))
+    return np.fft.irfft(spectrum, n=len(segment))[pad:pad + count]
+
+
+def filter_arrays(arrays, start, stop, mode, strength=1.0, iterations=1, radius=1,
+                  window=7, order=2, cutoff=0.1, noise_type='PERLIN', frequency=0.1,
+                  amplitude=1.0, seed=0):
+    """Filter keys [start, stop) of a CurveArrays in place
+
+    The brush modes get a uniform factor of ``strength``; SAVGOL and
+    BUTTERWORTH results are blended in by it. Returns the number of keys
+    changed.
+    """
+    if stop <= start:
+        return 0
+    indices = np.arange(start, stop)
+    factors = np.full(len(indices), float(strength))
+    values = arrays.values
+
+    if mode == 'SMOOTH':
+        apply_mode(mode, arrays.co, indices, factors, iterations=iterations, radius=radius)
+    elif mode == 'FLATTEN':
+        target = FlattenTarget(values[start:stop]).mean
+        apply_mode(mode, arrays.co, indices, factors, target=target)
+    elif mode == 'NOISE':
+        table = noise_field(arrays.times, noise_type, frequency, seed)
+        apply_mode(mode, arrays.co, indices, factors, table=table, amplitude=amplitude)
+    elif mode == 'SHARPEN':
+        apply_mode(mode, arrays.co, indices, factors)
+    elif mode in ('SAVGOL', 'BUTTERWORTH'):
+        if mode == 'SAVGOL':
+            filtered = savitzky_golay(values, window, order)
+        else:
+            filtered = butterworth(values, cutoff, order)
+        current = values[start:stop].astype(np.float64)
+        values[start:stop] = current + (filtered[start:stop] - current) * strength
+    else:
+        raise ValueError(f"unknown filter mode '{mode}'")
+
+    arrays.mark_dirty('co', start, stop)
+    return stop - start
+
+
+def filter_fcurve(fcurve, mode, frame_range=None, **options):
+    """Read, filter and write back one F-Curve, returning keys changed
+
+    ``frame_range`` is an inclusive (first, last) frame pair, None for the
+    whole curve. Other options are passed to ``filter_arrays``, a noise
+    ``seed`` is mixed with the curve's key so channels get different noise.
+    Handles move with their keys, as with the brush.
+    """
+    arrays = read_curve(fcurve, select=False)
+    if not len(arrays):
+        return 0
+    if frame_range is None:
+        start, stop = 0, len(arrays)
+    else:
+        times = arrays.times
+        start = int(np.searchsorted(times, frame_range[0], side="left"))
+        stop = int(np.searchsorted(times, frame_range[1], side="right"))
+    if mode == 'NOISE':
+        options['seed'] = curve_seed(options.get('seed', 0), curve_key(fcurve))
+    before = arrays.co[start:stop].copy()
+    changed = filter_arrays(arrays, start, stop, mode, **options)
+    if changed:
+        move_handles_with_keys(arrays, np.arange(start, stop), before)
+    if changed and write_curve(fcurve, arrays):
+        fcurve.update()
+    return changed
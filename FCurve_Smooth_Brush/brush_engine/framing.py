@@ -0,0 +1,62 @@
+"""Auto-frame targets computed from the keys the brush edited
+
+Bounds are (frame_min, frame_max, value_min, value_max) tuples taken
+from the arrays the brush already holds, so framing never walks the
+curves. ``frame_view`` only asks for a new view when the keys leave a
+margin inside the current one, and then changes it as little as it can.
+"""
+
+import numpy as np
+
+
+def keys_bounds(arrays, indices):
+    """Bounds of the keys at ``indices`` of a CurveArrays"""
+    co = arrays.co[indices]
+    low = co.min(axis=0)
+    high = co.max(axis=0)
+    return float(low[0]), float(high[0]), float(low[1]), float(high[1])
+
+
+def union_bounds(a, b):
+    """Bounds covering both, either may be None"""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), max(a[3], b[3])
+
+
+def _frame_axis(low, high, target_low, target_high, margin):
+    size = high - low
+    pad = size * margin
+    if target_low >= low + pad and target_high <= high - pad:
+        return low, high
+    needed = (target_high - target_low) * (1.0 + 2.0 * margin)
+    if needed > size:
+        # Zoom out around the keys
+        centre = (target_low + target_high) / 2.0
+        return centre - needed / 2.0, centre + needed / 2.0
+    # Pan just far enough to bring the keys back inside the margin
+    shift = 0.0
+    if target_low < low + pad:
+        shift = target_low - (low + pad)
+    elif target_high > high - pad:
+        shift = target_high - (high - pad)
+    return low + shift, high + shift
+
+
+def frame_view(view_bounds, target, margin=0.1):
+    """New view bounds showing ``target`` inside ``margin``, or None if it already is
+
+    ``margin`` is the fraction of the view kept clear on each side. Each
+    axis is panned when the keys fit at the current zoom and zoomed out
+    around them otherwise.
+    """
+    if target is None:
+        return None
+    frames = _frame_axis(view_bounds[0], view_bounds[1], target[0], target[1], margin)
+    values = _frame_axis(view_bounds[2], view_bounds[3], target[2], target[3], margin)
+    bounds = (frames[0], frames[1], values[0], values[1])
+    if np.allclose(bounds, view_bounds):
+        return None
+    return bounds
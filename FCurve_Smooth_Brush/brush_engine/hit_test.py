@@ -0,0 +1,95 @@
+"""Vectorized brush hit testing in view space
+
+The Graph Editor's View2D is a per-axis linear map, so the brush circle
+(round in region pixels) is an axis-aligned ellipse in frame/value space.
+Mapping it once per dab lets every keyframe be tested with array math
+instead of one ``view_to_region`` call per key.
+"""
+
+import numpy as np
+
+from .falloff import DEFAULT_FALLOFF
+
+
+class BrushFootprint:
+    """The brush circle expressed in view (frame/value) space"""
+
+    __slots__ = ("frame", "value", "radius_frame", "radius_value")
+
+    def __init__(self, frame, value, radius_frame, radius_value):
+        self.frame = frame
+        self.value = value
+        self.radius_frame = radius_frame
+        self.radius_value = radius_value
+
+    @property
+    def frame_range(self):
+        return self.frame - self.radius_frame, self.frame + self.radius_frame
+
+    @property
+    def value_range(self):
+        return self.value - self.radius_value, self.value + self.radius_value
+
+    def __repr__(self):
+        return (f"BrushFootprint(frame={self.frame:g}, value={self.value:g}, "
+                f"radius_frame={self.radius_frame:g}, radius_value={self.radius_value:g})")
+
+
+def brush_footprint(view, mouse_x, mouse_y, radius):
+    """Map a brush of ``radius`` pixels at a region position into view space
+
+    Uses two reference points, the brush centre and a point offset by the
+    radius on both axes, to get the View2D scale.
+    """
+    frame, value = view.region_to_view(mouse_x, mouse_y)
+    edge_frame, edge_value = view.region_to_view(mouse_x + radius, mouse_y + radius)
+    # Guard against a degenerate (zero-size) region
+    radius_frame = max(abs(edge_frame - frame), 1e-12)
+    radius_value = max(abs(edge_value - value), 1e-12)
+    return BrushFootprint(frame, value, radius_frame, radius_value)
+
+
+def normalized_distance_sq(times, values, footprint):
+    """Squared distance of each key to the brush centre, 1.0 on the rim"""
+    dt = (np.asarray(times, dtype=np.float64) - footprint.frame) / footprint.radius_frame
+    dv = (np.asarray(values, dtype=np.float64) - footprint.value) / footprint.radius_value
+    return dt * dt + dv * dv
+
+
+def footprints_range(footprints):
+    """Frame and value ranges covered by a batch of footprints"""
+    frames = [fp.frame_range for fp in footprints]
+    values = [fp.value_range for fp in footprints]
+    return ((min(f[0] for f in frames), max(f[1] for f in frames)),
+            (min(v[0] for v in values), max(v[1] for v in values)))
+
+
+def combine_hits(times, values, footprints, windows, strength, falloff=DEFAULT_FALLOFF):
+    """Falloff of several dabs over one curve, combined into one factor per key
+
+    ``windows`` holds the [start, stop) key range each footprint can reach.
+    Repeated blends toward a target by factors f1, f2, ... move a key by
+    ``1 - (1 - f1)(1 - f2)...`` of the way, which is what is returned, so
+    one kernel pass stands in for the whole batch. ``falloff`` is a
+    FalloffTable, ``1 - d²`` by default. Returns ``(indices, factors)``,
+    indices into the full curve.
+    """
+    spans = [w for w in windows if w[0] < w[1]]
+    if not spans:
+        return np.empty(0, dtype=np.intp), np.empty(0)
+    low = min(w[0] for w in spans)
+    high = max(w[1] for w in spans)
+
+    remaining = np.ones(high - low)
+    touched = np.zeros(high - low, dtype=bool)
+    for footprint, (start, stop) in zip(footprints, windows):
+        if start >= stop:
+            continue
+        dist_sq = normalized_distance_sq(times[start:stop], values[start:stop], footprint)
+        inside = np.flatnonzero(dist_sq <= 1.0)
+        slots = inside + (start - low)
+        remaining[slots] *= falloff.retained(dist_sq[inside], strength)
+        touched[slots] = True
+
+    hit = np.flatnonzero(touched)
+    return hit + low, 1.0 - remaining[hit]
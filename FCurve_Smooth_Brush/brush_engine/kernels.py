@@ -0,0 +1,296 @@
+"""Brush mode kernels operating on keyframe arrays
+
+Each kernel takes the full ``values`` and ``times`` arrays of one curve,
+the ``indices`` of the keys under the brush and their falloff ``factors``,
+and returns the new coordinates for those keys only. Neighbours come from
+direct indexing, so a dab costs O(keys under the brush). All keys read the
+pre-dab state, no kernel depends on the order keys are visited in.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from .noise import noise_field
+
+VALUE_AXIS = 1
+TIME_AXIS = 0
+
+
+def _interior(indices, count):
+    """Mask of the brushed keys that have a neighbour on both sides"""
+    return (indices > 0) & (indices < count - 1)
+
+
+@lru_cache(maxsize=64)
+def _smoothing_weights(iterations, radius):
+    box = np.full(2 * radius + 1, 1.0 / (2 * radius + 1))
+    weights = np.ones(1)
+    for _ in range(iterations):
+        weights = np.convolve(weights, box)
+    weights.flags.writeable = False
+    return weights
+
+
+def smoothing_kernel(iterations=1, radius=1):
+    """Weights equal to ``iterations`` passes of a (2 * radius + 1)-key average"""
+    return _smoothing_weights(max(int(iterations), 1), max(int(radius), 1))
+
+
+def odd_extended(values, start, stop):
+    """values[start:stop] as float64, continued past the ends by odd reflection
+
+    Reflecting through the end keys keeps them fixed under any symmetric
+    kernel, the same as repeated passes that never move the first and last
+    key. Reflections repeat for ranges reaching past both ends of a short
+    curve: the extension has period ``2 * (n - 1)`` plus a rise of
+    ``2 * (last - first)`` per period.
+    """
+    last = len(values) - 1
+    positions = np.arange(start, stop)
+    if last <= 0:
+        return np.full(len(positions), float(values[0]) if last == 0 else 0.0)
+    period = 2 * last
+    turns, folded = np.divmod(positions, period)
+    mirrored = folded > last
+    segment = values[np.where(mirrored, period - folded, folded)].astype(np.float64)
+    segment[mirrored] = 2.0 * values[last] - segment[mirrored]
+    segment += turns * (2.0 * (float(values[last]) - float(values[0])))
+    return segment
+
+
+def smooth(values, times, indices, factors, iterations=1, radius=1):
+    """Blend keys toward the average of themselves and their neighbours
+
+    ``iterations`` passes of a ``radius``-key neighbourhood average are
+    computed as one convolution over the brushed run of keys, matching the
+    result of repeating the pass over the whole curve with the end keys
+    held, then blended in by the falloff.
+    """
+    new = values[indices].astype(np.float64)
+    inner = _interior(indices, len(values))
+    i = indices[inner]
+    if not len(i):
+        return new
+    current = new[inner]
+
+    weights = smoothing_kernel(iterations, radius)
+    reach = len(weights) // 2
+    if reach == 1:
+        average = (values[i - 1] + current + values[i + 1]) / 3.0
+    else:
+        first = int(i.min())
+        segment = odd_extended(values, first - reach, int(i.max()) + reach + 1)
+        average = np.convolve(segment, weights, mode='valid')[i - first]
+    new[inner] = current + (average - current) * factors[inner]
+    return new
+
+
+def sharpen(values, times, indices, factors):
+    """Push keys away from the average of their neighbours"""
+    new = values[indices].astype(np.float64)
+    inner = _interior(indices, len(values))
+    i = indices[inner]
+    current = new[inner]
+    average = (values[i - 1].astype(np.float64) + values[i + 1]) / 2.0
+    new[inner] = current + (current - average) * factors[inner]
+    return new
+
+
+def relax(values, times, indices, factors):
+    """Move keys in time toward the midpoint of their neighbours
+
+    Returns new times rather than values.
+    """
+    new = times[indices].astype(np.float64)
+    inner = _interior(indices, len(times))
+    i = indices[inner]
+    current = new[inner]
+    ideal = (times[i - 1].astype(np.float64) + times[i + 1]) / 2.0
+    new[inner] = current + (ideal - current) * factors[inner]
+    return new
+
+
+def noise(values, times, indices, factors, original=None, table=None, amplitude=1.0):
+    """Blend keys toward their original value plus a noise offset
+
+    ``table`` holds one noise value per key of the curve, usually from
+    ``noise_field``, and ``original`` the values at the start of the
+    stroke, so repeated dabs converge instead of stacking. Without them
+    the current values and per-frame white noise are used.
+    """
+    current = values[indices].astype(np.float64)
+    base = current if original is None else original[indices]
+    if table is None:
+        offsets = noise_field(times[indices], 'WHITE')
+    else:
+        offsets = table[indices]
+    return current + (base + amplitude * offsets - current) * factors
+
+
+def flatten(values, times, indices, factors, target=None):
+    """Blend keys toward a target value
+
+    ``target`` is a scalar or one value per brushed key, usually from a
+    FlattenTarget. Without it the curve's current mean is used, which costs
+    O(n) per call.
+    """
+    current = values[indices].astype(np.float64)
+    if target is None:
+        if not len(values):
+            return current
+        target = values.mean(dtype=np.float64)
+    return current + (target - current) * factors
+
+
+def relative(values, times, indices, factors, original=None):
+    """Smooth keys while keeping their position between their neighbours
+
+    ``original`` holds the curve's values from the start of the stroke.
+    Each key keeps the fraction of the way it sat between its neighbours
+    in ``original``, and the falloff blends from that toward a plain
+    three-key average. Without a snapshot keys are left unchanged.
+    """
+    new = values[indices].astype(np.float64)
+    if original is None:
+        return new
+    inner = _interior(indices, len(values))
+    i = indices[inner]
+    orig_prev = original[i - 1]
+    orig_range = original[i + 1] - orig_prev
+    # Keys with level neighbours in the snapshot have no relative position
+    usable = np.abs(orig_range) >= 0.0001
+    i = i[usable]
+    position = (original[i] - orig_prev[usable]) / orig_range[usable]
+
+    prev = values[i - 1].astype(np.float64)
+    following = values[i + 1].astype(np.float64)
+    average = (prev + values[i] + following) / 3.0
+    target = prev + position * (following - prev)
+    factor = factors[inner][usable]
+    new[np.flatnonzero(inner)[usable]] = average * factor + target * (1.0 - factor)
+    return new
+
+
+def _runs_every_other(indices):
+    """Every other key of each run of consecutive ``indices``, starting with the first"""
+    if not len(indices):
+        return indices
+    breaks = np.diff(indices) != 1
+    starts = np.flatnonzero(np.concatenate(([True], breaks)))
+    run = np.cumsum(np.concatenate(([False], breaks)))
+    offset = np.arange(len(indices)) - starts[run]
+    return indices[offset % 2 == 0]
+
+
+def decimate(values, times, indices, factors, original=None, tolerance=0.01):
+    """Pick brushed keys that can be removed without leaving the tolerance
+
+    A key is removable when the straight line between its neighbours stays
+    within ``tolerance * factor`` of every key of ``original`` (an (n, 2)
+    snapshot of the curve from the start of the stroke, the current keys
+    by default) between them, so repeated dabs never drift further than
+    the tolerance. Neighbouring keys are never both removed in one pass.
+    Returns the sorted indices to remove.
+    """
+    inner = _interior(indices, len(values))
+    i = indices[inner]
+    if not len(i):
+        return i
+    if original is None:
+        orig_times = times.astype(np.float64)
+        orig_values = values.astype(np.float64)
+    else:
+        orig_times = original[:, 0]
+        orig_values = original[:, 1]
+
+    t_prev = times[i - 1].astype(np.float64)
+    t_next = times[i + 1].astype(np.float64)
+    v_prev = values[i - 1].astype(np.float64)
+    span = t_next - t_prev
+    slope = np.divide(values[i + 1] - v_prev, span, out=np.zeros(len(i)), where=span > 0)
+
+    # Every original key strictly between the neighbours, for all candidates at once
+    low = np.searchsorted(orig_times, t_prev, side="right")
+    high = np.searchsorted(orig_times, t_next, side="left")
+    lengths = np.maximum(high - low, 0)
+    owner = np.repeat(np.arange(len(i)), lengths)
+    first = np.cumsum(lengths) - lengths
+    positions = np.arange(lengths.sum()) - first[owner] + low[owner]
+    line = v_prev[owner] + slope[owner] * (orig_times[positions] - t_prev[owner])
+    deviation = np.abs(orig_values[positions] - line)
+
+    error = np.zeros(len(i))
+    has = lengths > 0
+    if deviation.size:
+        error[has] = np.maximum.reduceat(deviation, first[has])
+    removable = (error <= tolerance * factors[inner]) & (span > 0)
+    return _runs_every_other(i[removable])
+
+
+class FlattenTarget:
+    """Flatten reference values of one curve, built once per stroke
+
+    Keeps the curve's mean and a prefix sum of its values, so the mean of
+    any key range is O(1) and targets for k brushed keys cost O(k).
+    """
+
+    __slots__ = ("mean", "_prefix")
+
+    def __init__(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self._prefix = np.concatenate(([0.0], np.cumsum(values)))
+        self.mean = self._prefix[-1] / len(values) if len(values) else 0.0
+
+    def __len__(self):
+        return len(self._prefix) - 1
+
+    def range_mean(self, start, stop):
+        """Mean of keys [start, stop)"""
+        if stop <= start:
+            return self.mean
+        return (self._prefix[stop] - self._prefix[start]) / (stop - start)
+
+    def window_means(self, indices, half_width):
+        """Mean of the ``half_width`` keys either side of each index"""
+        count = len(self)
+        low = np.clip(indices - half_width, 0, count)
+        high = np.clip(indices + half_width + 1, 0, count)
+        return (self._prefix[high] - self._prefix[low]) / (high - low)
+
+    def targets(self, indices, method='CURVE', half_width=1):
+        """Flatten targets for the brushed keys
+
+        ``method`` is 'CURVE' (whole-curve mean), 'BRUSH' (mean of the key
+        run under the brush) or 'WINDOW' (moving average around each key).
+        """
+        if method == 'BRUSH' and len(indices):
+            return self.range_mean(int(indices.min()), int(indices.max()) + 1)
+        if method == 'WINDOW':
+            return self.window_means(indices, half_width)
+        return self.mean
+
+
+# brush_mode -> (kernel, axis of ``co`` it writes)
+MODE_KERNELS = {
+    'SMOOTH': (smooth, VALUE_AXIS),
+    'SHARPEN': (sharpen, VALUE_AXIS),
+    'RELAX': (relax, TIME_AXIS),
+    'NOISE': (noise, VALUE_AXIS),
+    'FLATTEN': (flatten, VALUE_AXIS),
+    'RELATIVE': (relative, VALUE_AXIS),
+}
+
+
+def apply_mode(mode, co, indices, factors, **options):
+    """Run a mode kernel on an (n, 2) ``co`` array in place
+
+    Extra keyword ``options`` are passed to the kernel. Returns the axis
+    that was written, or None for an unknown mode.
+    """
+    entry = MODE_KERNELS.get(mode)
+    if entry is None or not len(indices):
+        return None
+    kernel, axis = entry
+    co[indices, axis] = kernel(co[:, VALUE_AXIS], co[:, TIME_AXIS], indices, factors, **options)
+    return axis
@@ -0,0 +1,183 @@
+"""Bulk keyframe transfer between F-Curves and NumPy arrays.
+
+Everything here goes through ``keyframe_points.foreach_get`` /
+``foreach_set`` so a whole curve costs one RNA call per attribute instead
+of one per keyframe. Nothing imports bpy, the functions only need an
+object with a ``keyframe_points`` collection, so they work the same on
+real F-Curves and on the stand-ins in ``mock``.
+"""
+
+import numpy as np
+
+# RNA stores keyframe coordinates as float, matching it lets
+# foreach_get/foreach_set copy the buffer directly
+CO_DTYPE = np.float32
+
+VECTOR_ATTRS = ("co", "handle_left", "handle_right")
+FLAG_ATTRS = ("select_control_point",)
+# Remaining per-key attributes, only needed to rebuild a curve with fewer
+# keys. Enums go through foreach_get/foreach_set as ints.
+KEY_ATTRIBUTES = {
+    "interpolation": np.int32,
+    "easing": np.int32,
+    "handle_left_type": np.int32,
+    "handle_right_type": np.int32,
+    "type": np.int32,
+    "back": np.float32,
+    "amplitude": np.float32,
+    "period": np.float32,
+    "select_left_handle": bool,
+    "select_right_handle": bool,
+}
+
+
+class CurveArrays:
+    """Contiguous copies of one F-Curve's keyframe data"""
+
+    __slots__ = ("co", "handle_left", "handle_right", "select", "dirty")
+
+    def __init__(self, co, handle_left=None, handle_right=None, select=None):
+        self.co = co
+        self.handle_left = handle_left
+        self.handle_right = handle_right
+        self.select = select
+        # attribute name -> [start, stop) range touched since the last write
+        self.dirty = {}
+
+    def __len__(self):
+        return len(self.co)
+
+    @property
+    def times(self):
+        return self.co[:, 0]
+
+    @property
+    def values(self):
+        return self.co[:, 1]
+
+    def copy(self):
+        """Independent copy of the arrays, without the dirty ranges"""
+        def dup(data):
+            return None if data is None else data.copy()
+        return CurveArrays(self.co.copy(), dup(self.handle_left), dup(self.handle_right),
+                           dup(self.select))
+
+    def mark_dirty(self, attr, start=0, stop=None):
+        """Record that keys [start, stop) of an attribute were changed"""
+        if stop is None:
+            stop = len(self.co)
+        if stop <= start:
+            return
+        old = self.dirty.get(attr)
+        if old is not None:
+            start = min(start, old[0])
+            stop = max(stop, old[1])
+        self.dirty[attr] = (start, stop)
+
+    def mark_indices_dirty(self, attr, indices):
+        """Record changes to the given (sorted or unsorted) key indices"""
+        if len(indices):
+            self.mark_dirty(attr, int(indices.min()), int(indices.max()) + 1)
+
+
+def _get_vectors(points, attr, count):
+    buf = np.empty(count * 2, dtype=CO_DTYPE)
+    points.foreach_get(attr, buf)
+    return buf.reshape(count, 2)
+
+
+def read_curve(fcurve, handles=True, select=True):
+    """Read an F-Curve's keyframes into a CurveArrays in bulk"""
+    points = fcurve.keyframe_points
+    count = len(points)
+
+    arrays = CurveArrays(_get_vectors(points, "co", count))
+    if handles:
+        arrays.handle_left = _get_vectors(points, "handle_left", count)
+        arrays.handle_right = _get_vectors(points, "handle_right", count)
+    if select:
+        flags = np.empty(count, dtype=bool)
+        points.foreach_get("select_control_point", flags)
+        arrays.select = flags
+    return arrays
+
+
+def write_curve(fcurve, arrays):
+    """Write back the attributes of ``arrays`` marked dirty, one call each
+
+    foreach_set has no offset argument, so a dirty range selects which
+    attributes are sent rather than a sub-slice of them. Returns the number
+    of attributes written.
+    """
+    if not arrays.dirty:
+        return 0
+
+    points = fcurve.keyframe_points
+    if len(points) != len(arrays):
+        # The curve changed shape under us, writing would scramble keys
+        arrays.dirty.clear()
+        return 0
+
+    written = 0
+    for attr in VECTOR_ATTRS:
+        data = getattr(arrays, attr)
+        if attr in arrays.dirty and data is not None:
+            points.foreach_set(attr, data.ravel())
+            written += 1
+    if "select_control_point" in arrays.dirty and arrays.select is not None:
+        points.foreach_set("select_control_point", arrays.select)
+        written += 1
+
+    arrays.dirty.clear()
+    return written
+
+
+def read_key_attributes(fcurve):
+    """Read the KEY_ATTRIBUTES of every key, as a dict of arrays"""
+    points = fcurve.keyframe_points
+    count = len(points)
+    attributes = {}
+    for attr, dtype in KEY_ATTRIBUTES.items():
+        data = np.empty(count, dtype=dtype)
+        points.foreach_get(attr, data)
+        attributes[attr] = data
+    return attributes
+
+
+def rebuild_curve(fcurve, arrays, attributes=None):
+    """Replace all keys of an F-Curve with ``arrays`` in a few bulk calls
+
+    Used when the key count changes; the caller still has to call
+    ``fcurve.update()``. ``attributes`` are KEY_ATTRIBUTES arrays for the
+    new keys, defaults are kept for any left out.
+    """
+    points = fcurve.keyframe_points
+    points.clear()
+    points.add(len(arrays))
+    for attr in VECTOR_ATTRS:
+        data = getattr(arrays, attr)
+        if data is not None:
+            points.foreach_set(attr, data.ravel())
+    if arrays.select is not None:
+        points.foreach_set("select_control_point", arrays.select)
+    for attr, data in (attributes or {}).items():
+        points.foreach_set(attr, data)
+    arrays.dirty.clear()
+
+
+def remove_keys(fcurve, arrays, remove):
+    """Delete the keys at sorted ``remove`` indices in one rebuild
+
+    Repeated ``keyframe_points.remove`` is O(n) per key, rebuilding is
+    O(n) once. Returns the CurveArrays of the keys left.
+    """
+    keep = np.ones(len(arrays), dtype=bool)
+    keep[remove] = False
+    attributes = {attr: data[keep] for attr, data in read_key_attributes(fcurve).items()}
+
+    def kept(data):
+        return None if data is None else np.ascontiguousarray(data[keep])
+    remaining = CurveArrays(kept(arrays.co), kept(arrays.handle_left),
+                            kept(arrays.handle_right), kept(arrays.select))
+    rebuild_curve(fcurve, remaining, attributes)
+    return remaining
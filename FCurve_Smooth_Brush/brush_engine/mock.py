@@ -0,0 +1,241 @@
+"""Lightweight bpy-free stand-ins for F-Curves
+
+They implement just enough of the RNA API used by the brush engine
+(``keyframe_points`` with ``foreach_get``/``foreach_set``, item access and
+``update()``) to exercise it outside Blender, in tests and benchmarks.
+"""
+
+import numpy as np
+
+_VECTOR_ATTRS = {"co", "handle_left", "handle_right"}
+_FLAG_ATTRS = {"select_control_point"}
+# Other per-key attributes and their defaults (enums as their RNA index)
+_SCALAR_ATTRS = {
+    "interpolation": (np.int32, 1),
+    "easing": (np.int32, 0),
+    "handle_left_type": (np.int32, 4),
+    "handle_right_type": (np.int32, 4),
+    "type": (np.int32, 0),
+    "back": (np.float32, 1.70158),
+    "amplitude": (np.float32, 0.8),
+    "period": (np.float32, 4.1),
+    "select_left_handle": (bool, False),
+    "select_right_handle": (bool, False),
+}
+
+
+class MockKeyframe:
+    """View onto one key of a MockKeyframePoints, like bpy.types.Keyframe"""
+
+    __slots__ = ("_points", "_index")
+
+    def __init__(self, points, index):
+        self._points = points
+        self._index = index
+
+    def _vector(self, attr):
+        return self._points._data[attr][self._index]
+
+    @property
+    def co(self):
+        return self._vector("co")
+
+    @co.setter
+    def co(self, value):
+        self._points._data["co"][self._index] = value
+
+    @property
+    def handle_left(self):
+        return self._vector("handle_left")
+
+    @handle_left.setter
+    def handle_left(self, value):
+        self._points._data["handle_left"][self._index] = value
+
+    @property
+    def handle_right(self):
+        return self._vector("handle_right")
+
+    @handle_right.setter
+    def handle_right(self, value):
+        self._points._data["handle_right"][self._index] = value
+
+    @property
+    def select_control_point(self):
+        return bool(self._points._data["select_control_point"][self._index])
+
+    @select_control_point.setter
+    def select_control_point(self, value):
+        self._points._data["select_control_point"][self._index] = value
+
+
+class MockKeyframePoints:
+    """Stand-in for FCurveKeyframePoints backed by NumPy arrays"""
+
+    def __init__(self, co):
+        co = np.asarray(co, dtype=np.float32).reshape(-1, 2)
+        self._data = {}
+        self._set_co(co)
+        self.get_calls = 0
+        self.set_calls = 0
+
+    def _set_co(self, co):
+        self._data["co"] = co.copy()
+        # Flat handles a third of the way to each neighbour, like AUTO_CLAMPED
+        self._data["handle_left"] = co.copy()
+        self._data["handle_right"] = co.copy()
+        if len(co) > 1:
+            gaps = np.diff(co[:, 0]) / 3.0
+            self._data["handle_left"][1:, 0] -= gaps
+            self._data["handle_left"][0, 0] -= gaps[0]
+            self._data["handle_right"][:-1, 0] += gaps
+            self._data["handle_right"][-1, 0] += gaps[-1]
+        self._data["select_control_point"] = np.zeros(len(co), dtype=bool)
+        for attr, (dtype, default) in _SCALAR_ATTRS.items():
+            self._data[attr] = np.full(len(co), default, dtype=dtype)
+
+    def __len__(self):
+        return len(self._data["co"])
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("keyframe index out of range")
+        return MockKeyframe(self, index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield MockKeyframe(self, i)
+
+    def add(self, count):
+        """Append ``count`` keys at frame 0, like FCurveKeyframePoints.add"""
+        for attr, data in self._data.items():
+            extra = np.zeros((count,) + data.shape[1:], dtype=data.dtype)
+            if attr in _SCALAR_ATTRS:
+                extra[...] = _SCALAR_ATTRS[attr][1]
+            self._data[attr] = np.concatenate((data, extra))
+
+    def clear(self):
+        for attr, data in self._data.items():
+            self._data[attr] = data[:0].copy()
+
+    def _check(self, attr, seq):
+        if attr in _VECTOR_ATTRS:
+            expected = len(self) * 2
+        elif attr in _FLAG_ATTRS or attr in _SCALAR_ATTRS:
+            expected = len(self)
+        else:
+            raise AttributeError(f"mock keyframe has no attribute '{attr}'")
+        if len(seq) != expected:
+            raise RuntimeError(
+                f"foreach on '{attr}': expected {expected} items, got {len(seq)}")
+
+    def foreach_get(self, attr, seq):
+        self._check(attr, seq)
+        self.get_calls += 1
+        seq[:] = self._data[attr].ravel()
+
+    def foreach_set(self, attr, seq):
+        self._check(attr, seq)
+        self.set_calls += 1
+        data = self._data[attr]
+        data[...] = np.asarray(seq, dtype=data.dtype).reshape(data.shape)
+
+
+class MockAction:
+    """Stand-in for bpy.types.Action, owner of a list of curves"""
+
+    id_type = 'ACTION'
+
+    def __init__(self, name="Action"):
+        self.name = name
+        self.fcurves = []
+
+
+class MockFCurve:
+    """Stand-in for bpy.types.FCurve"""
+
+    def __init__(self, co, data_path="location", array_index=0, action=None):
+        if action is None:
+            action = MockAction()
+        action.fcurves.append(self)
+        self.id_data = action
+        self.data_path = data_path
+        self.array_index = array_index
+        self.keyframe_points = MockKeyframePoints(co)
+        self.hide = False
+        self.lock = False
+        self.select = True
+        self.update_calls = 0
+
+    def update(self):
+        self.update_calls += 1
+
+
+def make_curve(times, values, **kwargs):
+    """Build a MockFCurve from separate time and value sequences"""
+    co = np.column_stack((np.asarray(times, dtype=np.float32),
+                          np.asarray(values, dtype=np.float32)))
+    return MockFCurve(co, **kwargs)
+
+
+class MockView2D:
+    """Stand-in for bpy.types.View2D mapping a view rectangle onto a region"""
+
+    def __init__(self, frame_min=0.0, frame_max=250.0, value_min=-10.0,
+                 value_max=10.0, width=1000, height=600):
+        self.frame_min = frame_min
+        self.frame_max = frame_max
+        self.value_min = value_min
+        self.value_max = value_max
+        self.width = width
+        self.height = height
+
+    def region_to_view(self, x, y):
+        frame = self.frame_min + x / self.width * (self.frame_max - self.frame_min)
+        value = self.value_min + y / self.height * (self.value_max - self.value_min)
+        return frame, value
+
+    def view_to_region(self, x, y, clip=True):
+        rx = (x - self.frame_min) / (self.frame_max - self.frame_min) * self.width
+        ry = (y - self.value_min) / (self.value_max - self.value_min) * self.height
+        if clip and not (0 <= rx <= self.width and 0 <= ry <= self.height):
+            # Blender returns this sentinel for points outside the region
+            return 12000, 12000
+        return int(rx), int(ry)
+
+
+class MockBrushSettings:
+    """Stand-in for the scene's FCurveSmoothBrushProperties, same defaults"""
+
+    def __init__(self, **overrides):
+        self.brush_size = 50.0
+        self.strength = 0.5
+        self.falloff_type = 'SMOOTH'
+        self.spacing = 0.25
+        self.iterations = 1
+        self.smooth_radius = 1
+        self.brush_mode = 'SMOOTH'
+        self.noise_type = 'PERLIN'
+        self.noise_frequency = 0.1
+        self.noise_amplitude = 1.0
+        self.noise_seed = 0
+        self.decimate_error = 0.01
+        self.flatten_target = 'CURVE'
+        self.flatten_window = 5
+        self.affect_selected = False
+        self.select_while_painting = False
+        self.auto_frame = False
+        self.preserve_handles = True
+        self.defer_update = True
+        self.use_threads = False
+        self.thread_min_curves = 32
+        self.thread_count = 0
+        self.undo_memory = 64.0
+        self.show_stats = False
+        self.stats_log_path = ""
+        for name, value in overrides.items():
+            if not hasattr(self, name):
+                raise AttributeError(f"unknown brush setting '{name}'")
+            setattr(self, name, value)
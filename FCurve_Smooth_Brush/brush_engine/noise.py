@@ -0,0 +1,62 @@
+"""Seeded noise tables keyed on frame
+
+Noise is a pure function of (frame, seed), so the same curve gets the same
+offsets on every dab, every stroke and every run. A whole curve's table is
+built with one vectorized call.
+"""
+
+import zlib
+
+import numpy as np
+
+NOISE_TYPES = ('WHITE', 'VALUE', 'PERLIN')
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+
+
+def curve_seed(seed, key):
+    """Stable per-curve seed, so channels of one stroke don't move in lockstep"""
+    return (int(seed) * 1000003 + zlib.crc32(repr(key).encode("utf-8"))) & 0xFFFFFFFF
+
+
+def lattice(cells, seed=0):
+    """Uniform values in [-1, 1] for integer lattice ``cells`` (splitmix64 hash)"""
+    with np.errstate(over='ignore'):
+        h = np.asarray(cells, dtype=np.int64).astype(np.uint64)
+        h = h + np.uint64(seed) * _GOLDEN + _GOLDEN
+        h = (h ^ (h >> np.uint64(30))) * _MIX_1
+        h = (h ^ (h >> np.uint64(27))) * _MIX_2
+        h = h ^ (h >> np.uint64(31))
+    return (h >> np.uint64(11)).astype(np.float64) * (2.0 / 2.0 ** 53) - 1.0
+
+
+def _fade(t):
+    return t * t * t * (t * (t * 6.0 - 15.0) + 10.0)
+
+
+def noise_field(times, kind='PERLIN', frequency=0.1, seed=0):
+    """Noise in about [-1, 1] at each frame of ``times``
+
+    'WHITE' gives every frame an independent value. 'VALUE' eases between
+    random values placed ``1 / frequency`` frames apart, 'PERLIN' between
+    random slopes, which has no flat spots at the lattice points.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    if kind == 'WHITE':
+        return lattice(np.round(times), seed)
+    x = times * max(float(frequency), 1e-6)
+    cell = np.floor(x)
+    t = x - cell
+    fade = _fade(t)
+    if kind == 'VALUE':
+        a = lattice(cell, seed)
+        b = lattice(cell + 1, seed)
+        return a + (b - a) * fade
+    if kind == 'PERLIN':
+        a = lattice(cell, seed) * t
+        b = lattice(cell + 1, seed) * (t - 1.0)
+        # 1D gradient noise peaks at 0.5, scale it to about [-1, 1]
+        return (a + (b - a) * fade) * 2.0
+    raise ValueError(f"unknown noise type '{kind}'")
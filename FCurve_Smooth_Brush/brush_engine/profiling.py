@@ -0,0 +1,96 @@
+"""Lightweight per-stroke timers and counters for the brush hot path
+
+When disabled every ``stage()`` returns the same no-op context manager and
+``add()`` returns immediately, so leaving the calls in the hot path costs
+nothing measurable.
+"""
+
+import json
+import time
+
+STAGES = ("gather", "hit_test", "kernel", "commit", "write", "update", "auto_frame")
+COUNTERS = ("dabs", "batches", "curves_visited", "keys_tested", "keys_modified", "keys_removed")
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("_stats", "_name", "_start")
+
+    def __init__(self, stats, name):
+        self._stats = stats
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._stats.seconds[self._name] += time.perf_counter() - self._start
+        return False
+
+
+class BrushStats:
+    """Stage timings and counters of the current stroke"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.seconds = dict.fromkeys(STAGES, 0.0)
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self._stages = {name: _Stage(self, name) for name in STAGES}
+        self.started = time.perf_counter()
+
+    def reset(self):
+        for name in self.seconds:
+            self.seconds[name] = 0.0
+        for name in self.counters:
+            self.counters[name] = 0
+        self.started = time.perf_counter()
+
+    def stage(self, name):
+        """Context manager timing one stage, a no-op when disabled"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return self._stages[name]
+
+    def add(self, name, amount=1):
+        if self.enabled:
+            self.counters[name] += amount
+
+    def to_dict(self, **extra):
+        """Snapshot of the stroke's numbers, timings in milliseconds"""
+        data = {
+            "duration_ms": (time.perf_counter() - self.started) * 1000.0,
+            "stages_ms": {name: secs * 1000.0 for name, secs in self.seconds.items()},
+            "counters": dict(self.counters),
+        }
+        data.update(extra)
+        return data
+
+    def to_json(self, **extra):
+        return json.dumps(self.to_dict(**extra))
+
+    def summary_lines(self):
+        """Short text lines for an on-screen overlay"""
+        c = self.counters
+        lines = [
+            f"Dabs {c['dabs']}  Batches {c['batches']}  Curves {c['curves_visited']}",
+            f"Keys tested {c['keys_tested']}  modified {c['keys_modified']}  removed {c['keys_removed']}",
+        ]
+        batches = max(c["batches"], 1)
+        for name in STAGES:
+            ms = self.seconds[name] * 1000.0
+            lines.append(f"{name:<10} {ms:8.2f} ms  ({ms / batches:6.3f} / batch)")
+        return lines
@@ -0,0 +1,206 @@
+"""Recorded strokes and headless replay
+
+A StrokeRecording keeps every dab of a stroke as view-space (frame,
+value) positions with its batch number and time since the stroke began,
+plus the view and region it was painted in and a copy of the brush
+settings. The region positions as painted are kept too, so replaying in
+the recorded view does not go through a lossy view round trip. Recordings are saved as compressed ``.npz`` files and can be
+replayed onto any curves with ``replay_stroke``, without the modal
+operator or redraws, for batch cleanup of many takes or as repeatable
+performance fixtures.
+"""
+
+import json
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from .async_stroke import snapshot_settings
+from .brush import BrushEngine
+
+FORMAT_VERSION = 1
+
+
+class RecordedView:
+    """Linear View2D stand-in for the view a stroke was recorded in"""
+
+    __slots__ = ("frame_min", "frame_max", "value_min", "value_max", "width", "height")
+
+    def __init__(self, frame_min, frame_max, value_min, value_max, width, height):
+        self.frame_min = frame_min
+        self.frame_max = frame_max
+        self.value_min = value_min
+        self.value_max = value_max
+        self.width = width
+        self.height = height
+
+    @classmethod
+    def capture(cls, view, width, height):
+        """Record the view rectangle a View2D shows over a region"""
+        frame_min, value_min = view.region_to_view(0, 0)
+        frame_max, value_max = view.region_to_view(width, height)
+        return cls(frame_min, frame_max, value_min, value_max, width, height)
+
+    def as_tuple(self):
+        return (self.frame_min, self.frame_max, self.value_min, self.value_max,
+                self.width, self.height)
+
+    def region_to_view(self, x, y):
+        frame = self.frame_min + x / self.width * (self.frame_max - self.frame_min)
+        value = self.value_min + y / self.height * (self.value_max - self.value_min)
+        return frame, value
+
+    def view_to_region(self, frame, value, clip=True):
+        x = (frame - self.frame_min) / (self.frame_max - self.frame_min) * self.width
+        y = (value - self.value_min) / (self.value_max - self.value_min) * self.height
+        if clip and not (0 <= x <= self.width and 0 <= y <= self.height):
+            return 12000, 12000
+        return x, y
+
+
+class StrokeRecording:
+    """The dabs of one stroke in view space, with the settings they used"""
+
+    def __init__(self, view=None, settings=None):
+        self.view = view
+        # Plain dict of the SETTING_NAMES values
+        self.settings = settings or {}
+        # Samples of a CUSTOM falloff, centre to rim, when the stroke used one
+        self.falloff_curve = None
+        self.frames = np.empty(0)
+        self.values = np.empty(0)
+        # (m, 2) region positions as painted, empty for recordings without them
+        self.regions = np.empty((0, 2))
+        self.times = np.empty(0)
+        self.batches = np.empty(0, dtype=np.int32)
+        self._chunks = []
+        self._batch = 0
+        self._started = None
+
+    def __len__(self):
+        self._merge()
+        return len(self.frames)
+
+    @property
+    def duration(self):
+        self._merge()
+        return float(self.times[-1]) if len(self.times) else 0.0
+
+    @property
+    def batch_count(self):
+        self._merge()
+        return int(self.batches[-1]) + 1 if len(self.batches) else 0
+
+    def add(self, view, region_size, dabs, settings):
+        """Append one batch of region-space dabs as the brush applied it"""
+        if not len(dabs):
+            return
+        now = time.perf_counter()
+        if self._started is None:
+            self._started = now
+            self.view = RecordedView.capture(view, *region_size)
+            self.settings = vars(snapshot_settings(settings))
+        positions = np.array([view.region_to_view(x, y) for x, y in dabs], dtype=np.float64)
+        regions = np.array(dabs, dtype=np.float64).reshape(-1, 2)
+        self._chunks.append((positions, now - self._started, self._batch, regions))
+        self._batch += 1
+
+    def _merge(self):
+        if not self._chunks:
+            return
+        positions = np.concatenate([chunk[0] for chunk in self._chunks])
+        counts = [len(chunk[0]) for chunk in self._chunks]
+        self.frames = np.concatenate((self.frames, positions[:, 0]))
+        self.values = np.concatenate((self.values, positions[:, 1]))
+        self.regions = np.concatenate([self.regions] + [chunk[3] for chunk in self._chunks])
+        self.times = np.concatenate((self.times, np.repeat([c[1] for c in self._chunks], counts)))
+        self.batches = np.concatenate(
+            (self.batches, np.repeat([c[2] for c in self._chunks], counts).astype(np.int32)))
+        self._chunks = []
+
+    def region_dabs(self, view=None):
+        """(m, 2) region positions of every dab for ``view`` (the recorded one by default)"""
+        self._merge()
+        if (view is None or view is self.view) and len(self.regions) == len(self.frames):
+            return self.regions.copy()
+        view = view or self.view
+        return np.array([view.view_to_region(f, v, clip=False)
+                         for f, v in zip(self.frames.tolist(), self.values.tolist())],
+                        dtype=np.float64).reshape(-1, 2)
+
+    def batch_slices(self):
+        """[start, stop) dab ranges of the batches as they were applied"""
+        self._merge()
+        if not len(self.batches):
+            return []
+        edges = np.flatnonzero(np.diff(self.batches)) + 1
+        bounds = np.concatenate(([0], edges, [len(self.batches)]))
+        return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+    def save(self, path):
+        self._merge()
+        extra = {}
+        if self.falloff_curve is not None:
+            extra["falloff_curve"] = np.asarray(self.falloff_curve, dtype=np.float64)
+        np.savez_compressed(
+            path,
+            version=np.int32(FORMAT_VERSION),
+            frames=self.frames,
+            values=self.values,
+            regions=self.regions,
+            times=self.times,
+            batches=self.batches,
+            view=np.array(self.view.as_tuple(), dtype=np.float64),
+            settings=np.array(json.dumps(self.settings)),
+            **extra,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            version = int(data["version"])
+            if version > FORMAT_VERSION:
+                raise ValueError(f"stroke recording version {version} is newer than supported")
+            recording = cls(RecordedView(*data["view"].tolist()),
+                            json.loads(str(data["settings"])))
+            recording.frames = data["frames"]
+            recording.values = data["values"]
+            recording.times = data["times"]
+            recording.batches = data["batches"]
+            if "regions" in data.files:
+                recording.regions = data["regions"]
+            if "falloff_curve" in data.files:
+                recording.falloff_curve = data["falloff_curve"]
+        return recording
+
+
+def replay_stroke(recording, curves, engine=None, single_pass=True, **overrides):
+    """Apply a recorded stroke to ``curves`` without the modal loop
+
+    With ``single_pass`` every dab is applied in one batch, one pass per
+    curve; otherwise the recorded batches are replayed in order, which
+    reproduces the original result exactly. ``overrides`` replace recorded
+    settings. Returns the stroke's undo record (or None).
+    """
+    settings = dict(recording.settings)
+    for name, value in overrides.items():
+        if name not in settings:
+            raise AttributeError(f"unknown brush setting '{name}'")
+        settings[name] = value
+    settings = SimpleNamespace(**settings)
+
+    engine = engine or BrushEngine()
+    if recording.falloff_curve is not None:
+        engine.custom_falloff = recording.falloff_curve
+    view = recording.view
+    region_size = (view.width, view.height)
+    dabs = recording.region_dabs()
+    engine.begin_stroke(curves)
+    if single_pass:
+        engine.apply_dabs(view, region_size, dabs.tolist(), settings)
+    else:
+        for start, stop in recording.batch_slices():
+            engine.apply_dabs(view, region_size, dabs[start:stop].tolist(), settings)
+    return engine.end_stroke()
+
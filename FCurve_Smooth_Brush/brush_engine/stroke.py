@@ -0,0 +1,48 @@
+"""Stroke path resampling
+
+Turns the raw mouse path of a stroke into dab positions spaced a fixed
+distance apart, so the amount of brushing depends on how far the brush
+travelled rather than on how often events arrive.
+"""
+
+import math
+
+import numpy as np
+
+
+class StrokeSpacer:
+    """Emits evenly spaced dab positions along a mouse path"""
+
+    def __init__(self, spacing):
+        self.spacing = max(float(spacing), 1e-6)
+        self._last = None
+        # Path length travelled since the last dab
+        self._travel = 0.0
+
+    def start(self, x, y):
+        """Begin a new path, the first sample always gets a dab"""
+        self._last = (float(x), float(y))
+        self._travel = 0.0
+        return np.array([self._last])
+
+    def add(self, x, y):
+        """Extend the path to (x, y), returning the new dabs as an (m, 2) array"""
+        if self._last is None:
+            return self.start(x, y)
+        x0, y0 = self._last
+        dx = float(x) - x0
+        dy = float(y) - y0
+        length = math.hypot(dx, dy)
+        self._last = (float(x), float(y))
+        if length == 0.0:
+            return np.empty((0, 2))
+
+        first = self.spacing - self._travel
+        if first > length:
+            self._travel += length
+            return np.empty((0, 2))
+
+        offsets = np.arange(first, length + 1e-9, self.spacing)
+        self._travel = length - offsets[-1]
+        t = offsets / length
+        return np.column_stack((x0 + dx * t, y0 + dy * t))
@@ -0,0 +1,75 @@
+"""Cached sorted-frame index per F-Curve
+
+Keyframes are stored sorted by frame, so the keys a brush can reach form
+one contiguous run that two binary searches find. The index keeps a copy
+of the frames and a cheap signature so it is only rebuilt when the curve's
+key count or key times change.
+"""
+
+import numpy as np
+
+# Number of evenly spaced keys sampled for the change signature
+SIGNATURE_SAMPLES = 16
+
+
+def curve_key(fcurve):
+    """Stable identity of an F-Curve across RNA wrapper instances
+
+    (owner ID type, owner name, data path, array index): the owner is the
+    Action of an animation curve and the animated ID of a driver.
+    """
+    owner = getattr(fcurve, "id_data", None)
+    return (getattr(owner, "id_type", None), getattr(owner, "name", None),
+            fcurve.data_path, fcurve.array_index)
+
+
+def sample_positions(count):
+    """Evenly spread key positions sampled for cheap curve signatures"""
+    if count <= SIGNATURE_SAMPLES:
+        return np.arange(count)
+    return np.linspace(0, count - 1, SIGNATURE_SAMPLES).astype(np.intp)
+
+
+class FrameIndex:
+    """Binary-searchable frames of one F-Curve"""
+
+    __slots__ = ("times", "is_sorted", "_samples", "_signature")
+
+    def __init__(self, times):
+        self.times = np.array(times, dtype=np.float64)
+        self.is_sorted = bool(np.all(self.times[1:] >= self.times[:-1]))
+        self._samples = sample_positions(len(self.times))
+        self._signature = self.times[self._samples]
+
+    def __len__(self):
+        return len(self.times)
+
+    def matches(self, times):
+        """Whether ``times`` still look like the frames this index was built on
+
+        Compares the key count and a fixed set of sampled keys, O(1) per call.
+        Edits that move a key in time from inside the brush must call for a
+        rebuild explicitly.
+        """
+        if len(times) != len(self.times):
+            return False
+        return np.array_equal(np.asarray(times)[self._samples], self._signature)
+
+    def window(self, frame_min, frame_max):
+        """Return the [start, stop) index range of keys within the frames"""
+        if not self.is_sorted:
+            return 0, len(self.times)
+        start = int(np.searchsorted(self.times, frame_min, side="left"))
+        stop = int(np.searchsorted(self.times, frame_max, side="right"))
+        return start, stop
+
+
+def frame_index(indices, key, times):
+    """Look up the index for ``key``, rebuilding it if stale
+
+    ``indices`` is the caller's dict of FrameIndex objects.
+    """
+    index = indices.get(key)
+    if index is None or not index.matches(times):
+        index = indices[key] = FrameIndex(times)
+    return index
@@ -0,0 +1,213 @@
+"""Compact stroke-level undo history
+
+A stroke only stores the curves it touched, and for each of them only the
+index range it touched, as before/after NumPy slices of ``co``, the
+handles and the selection flags. The history is bounded by a byte budget
+instead of a number of steps and keeps a cursor so redo states survive
+undo. Strokes that change a curve's key count keep the whole curve, with
+every key attribute, and restore it by rebuilding the curve.
+"""
+
+from .keyframe_io import CurveArrays, read_curve, read_key_attributes, rebuild_curve, write_curve
+
+# update() recalculates auto handles of the keys next to an edited one
+HANDLE_PADDING = 1
+
+_SLICED_ATTRS = ("co", "handle_left", "handle_right", "select")
+_DIRTY_NAMES = {"co": "co", "handle_left": "handle_left", "handle_right": "handle_right",
+                "select": "select_control_point"}
+
+
+class CurveDelta:
+    """Before/after data of one touched key range of a curve
+
+    With ``resized`` set, before and after hold whole curves of different
+    lengths, each including the KEY_ATTRIBUTES arrays.
+    """
+
+    __slots__ = ("key", "start", "before", "after", "resized")
+
+    def __init__(self, key, start, before, after, resized=False):
+        self.key = key
+        self.start = start
+        # attribute -> array slice, for each of _SLICED_ATTRS
+        self.before = before
+        self.after = after
+        self.resized = resized
+
+    @property
+    def stop(self):
+        return self.start + len(self.before["co"])
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in self.before.values()) + sum(a.nbytes for a in self.after.values())
+
+    def apply(self, fcurve, redo=False):
+        """Write the before (or after, for redo) slice back to ``fcurve``"""
+        if self.resized:
+            data = dict(self.after if redo else self.before)
+            arrays = CurveArrays(*(data.pop(attr) for attr in _SLICED_ATTRS))
+            rebuild_curve(fcurve, arrays, data)
+            fcurve.update()
+            return True
+        arrays = read_curve(fcurve)
+        if len(arrays) < self.stop:
+            return False
+        data = self.after if redo else self.before
+        for attr in _SLICED_ATTRS:
+            getattr(arrays, attr)[self.start:self.stop] = data[attr]
+            arrays.mark_dirty(_DIRTY_NAMES[attr], self.start, self.stop)
+        write_curve(fcurve, arrays)
+        fcurve.update()
+        return True
+
+
+class StrokeRecord:
+    """All curve deltas of one stroke"""
+
+    __slots__ = ("deltas",)
+
+    def __init__(self, deltas):
+        self.deltas = deltas
+
+    @property
+    def nbytes(self):
+        return sum(d.nbytes for d in self.deltas)
+
+    def apply(self, resolve, redo=False):
+        """Restore every curve, ``resolve`` maps a curve key to an F-Curve or None"""
+        restored = 0
+        for delta in self.deltas:
+            fcurve = resolve(delta.key)
+            if fcurve is not None and delta.apply(fcurve, redo=redo):
+                restored += 1
+        return restored
+
+
+def _slice(arrays, start, stop):
+    return {attr: getattr(arrays, attr)[start:stop].copy() for attr in _SLICED_ATTRS}
+
+
+class StrokeRecorder:
+    """Collects the touched curves and ranges while a stroke is painted"""
+
+    def __init__(self):
+        # key -> [fcurve, before CurveArrays, start, stop, before KEY_ATTRIBUTES or None]
+        self._touched = {}
+
+    def __len__(self):
+        return len(self._touched)
+
+    def touch(self, key, fcurve, indices, arrays=None, resize=False):
+        """Note that keys at ``indices`` of a curve are about to change
+
+        Must be called before the change is written, the first call per
+        curve snapshots its current state, copied from ``arrays`` when they
+        hold handles and selection, else read from the curve. Pass
+        ``resize`` when keys may be added or removed, so the other key
+        attributes are kept too.
+        """
+        if not len(indices):
+            return
+        start = int(indices.min())
+        stop = int(indices.max()) + 1
+        entry = self._touched.get(key)
+        if entry is None:
+            if arrays is not None and arrays.handle_left is not None and arrays.select is not None:
+                before = arrays.copy()
+            else:
+                before = read_curve(fcurve)
+            attributes = read_key_attributes(fcurve) if resize else None
+            self._touched[key] = [fcurve, before, start, stop, attributes]
+        else:
+            entry[2] = min(entry[2], start)
+            entry[3] = max(entry[3], stop)
+
+    def finish(self):
+        """Read the touched curves' final state and build a StrokeRecord"""
+        deltas = []
+        for key, (fcurve, before, start, stop, attributes) in self._touched.items():
+            after = read_curve(fcurve)
+            if len(after) != len(before):
+                # Key count changed, keep both whole curves
+                old = _slice(before, 0, len(before))
+                new = _slice(after, 0, len(after))
+                if attributes is not None:
+                    old.update(attributes)
+                    new.update(read_key_attributes(fcurve))
+                deltas.append(CurveDelta(key, 0, old, new, resized=True))
+                continue
+            start = max(start - HANDLE_PADDING, 0)
+            stop = min(stop + HANDLE_PADDING, len(before))
+            deltas.append(CurveDelta(key, start, _slice(before, start, stop), _slice(after, start, stop)))
+        self._touched.clear()
+        return StrokeRecord(deltas) if deltas else None
+
+
+class UndoHistory:
+    """Stroke records under a memory budget, with an undo/redo cursor"""
+
+    def __init__(self, budget_bytes=64 * 1024 * 1024):
+        self.budget_bytes = budget_bytes
+        self._records = []
+        # Number of records currently applied, records[cursor:] are redo states
+        self._cursor = 0
+        self._nbytes = 0
+
+    def __len__(self):
+        return len(self._records)
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    @property
+    def can_undo(self):
+        return self._cursor > 0
+
+    @property
+    def can_redo(self):
+        return self._cursor < len(self._records)
+
+    def clear(self):
+        self._records.clear()
+        self._cursor = 0
+        self._nbytes = 0
+
+    def push(self, record):
+        """Add a new stroke, discarding redo states and evicting to the budget"""
+        if record is None:
+            return
+        for dropped in self._records[self._cursor:]:
+            self._nbytes -= dropped.nbytes
+        del self._records[self._cursor:]
+        self._records.append(record)
+        self._nbytes += record.nbytes
+        self._cursor = len(self._records)
+        self.trim()
+
+    def trim(self):
+        """Drop the oldest records until the history fits the budget
+
+        The newest record is always kept so the last stroke can be undone.
+        """
+        while self._nbytes > self.budget_bytes and len(self._records) > 1:
+            oldest = self._records.pop(0)
+            self._nbytes -= oldest.nbytes
+            self._cursor = max(self._cursor - 1, 0)
+
+    def undo(self):
+        """Step the cursor back, returning the record to revert or None"""
+        if not self.can_undo:
+            return None
+        self._cursor -= 1
+        return self._records[self._cursor]
+
+    def redo(self):
+        """Step the cursor forward, returning the record to reapply or None"""
+        if not self.can_redo:
+            return None
+        record = self._records[self._cursor]
+        self._cursor += 1
+        return record
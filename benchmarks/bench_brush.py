@@ -0,0 +1,207 @@
+"""Headless benchmark of the brush engine
+
+Drives brush_engine.BrushEngine against synthetic curves through the
+stand-ins in brush_engine.mock, so it runs on any machine with NumPy and no
+Blender. Each dab is applied on its own (as the modal operator does on a
+slow stroke) and timed.
+
+    python benchmarks/bench_brush.py --quick
+    python benchmarks/bench_brush.py --sizes 1000,100000 --channels 1,100 --json out.json
+    python benchmarks/bench_brush.py --recording strokes/stroke.npz --sizes 100000
+
+With ``--recording`` a stroke saved by the add-on's Record Strokes option
+is replayed batch by batch, as it was painted, over synthetic curves
+placed under it.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "FCurve_Smooth_Brush"))
+
+from brush_engine import BRUSH_MODES, BrushEngine, StrokeRecording  # noqa: E402
+from brush_engine.mock import MockAction, MockBrushSettings, MockView2D, make_curve  # noqa: E402
+
+REGION_WIDTH = 1000
+REGION_HEIGHT = 600
+# Frames shown across the region, the Graph Editor zoom level
+VISIBLE_FRAMES = 500.0
+# Frames over which the mocap drift is detrended
+DRIFT_WINDOW = 1000
+
+
+def base_shape(frames):
+    return np.sin(frames / 40.0)
+
+
+def make_curves(count, channels, kind, rng):
+    """Synthetic channels sharing one shape so a stroke crosses all of them"""
+    frames = np.arange(count, dtype=np.float64)
+    base = base_shape(frames)
+    action = MockAction("Bench")
+    curves = []
+    for channel in range(channels):
+        if kind == "mocap":
+            # Random walk drift plus high-frequency jitter, like raw capture.
+            # The drift's running mean is removed so it wanders locally but
+            # never carries the curve out of the brush's reach.
+            drift = detrend(np.cumsum(rng.normal(0.0, 0.002, count)), DRIFT_WINDOW)
+            values = base + drift + rng.normal(0.0, 0.02, count)
+        else:
+            values = base + 0.01 * np.sin(frames / 7.0 + channel)
+        curves.append(make_curve(frames, values, data_path="location",
+                                 array_index=channel, action=action))
+    return curves
+
+
+def detrend(values, window):
+    """``values`` minus their running mean over ``window`` samples"""
+    window = min(window, len(values))
+    sums = np.cumsum(np.concatenate(([0.0], values)))
+    low = np.clip(np.arange(len(values)) - window // 2, 0, len(values) - window)
+    return values - (sums[low + window] - sums[low]) / window
+
+
+def stroke_positions(view, curves, dabs):
+    """Dab region positions sweeping along the curves around the middle
+
+    The path follows the mean of the generated values, so the brush stays
+    on the keys whatever the data.
+    """
+    times = curves[0].keyframe_points._data["co"][:, 0]
+    centre = (times[0] + times[-1]) / 2.0
+    frames = np.linspace(centre - VISIBLE_FRAMES * 0.3, centre + VISIBLE_FRAMES * 0.3, dabs)
+    values = np.mean([np.interp(frames, times, fc.keyframe_points._data["co"][:, 1])
+                      for fc in curves], axis=0)
+    return [view.view_to_region(f, v, clip=False) for f, v in zip(frames, values)]
+
+
+def recorded_case(recording, count, channels, kind, rng):
+    """Curves under a recorded stroke and the stroke's batches of dabs"""
+    view = recording.view
+    curves = make_curves(count, channels, kind, rng)
+    # Centre the keys on the recorded view, one per frame, and scale the
+    # shape to half of its height
+    frame_offset = np.float32((view.frame_min + view.frame_max - count) / 2.0)
+    centre = (view.value_min + view.value_max) / 2.0
+    scale = (view.value_max - view.value_min) / 4.0
+    for fcurve in curves:
+        co = fcurve.keyframe_points._data["co"]
+        co[:, 0] += frame_offset
+        co[:, 1] = centre + co[:, 1] * scale
+    dabs = recording.region_dabs()
+    batches = [dabs[start:stop].tolist() for start, stop in recording.batch_slices()]
+    return curves, view, (int(view.width), int(view.height)), batches
+
+
+def run_case(count, channels, kind, mode, dabs, rng, threads=False, recording=None):
+    if recording is None:
+        curves = make_curves(count, channels, kind, rng)
+        centre = count / 2.0
+        view = MockView2D(centre - VISIBLE_FRAMES / 2, centre + VISIBLE_FRAMES / 2,
+                          -2.0, 2.0, REGION_WIDTH, REGION_HEIGHT)
+        region_size = (REGION_WIDTH, REGION_HEIGHT)
+        batches = [[position] for position in stroke_positions(view, curves, dabs)]
+    else:
+        curves, view, region_size, batches = recorded_case(recording, count, channels, kind, rng)
+    settings = MockBrushSettings(brush_mode=mode, use_threads=threads)
+
+    engine = BrushEngine()
+    engine.begin_stroke(curves, stats_enabled=True)
+    latencies = np.empty(len(batches))
+    for i, batch in enumerate(batches):
+        start = time.perf_counter()
+        engine.apply_dabs(view, region_size, batch, settings)
+        latencies[i] = time.perf_counter() - start
+    start = time.perf_counter()
+    engine.end_stroke()
+    end_stroke = time.perf_counter() - start
+    engine.shutdown()
+
+    stats = engine.stats
+    total = latencies.sum()
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1000.0
+    return {
+        "data": kind,
+        "keys": count,
+        "channels": channels,
+        "mode": mode,
+        "threads": threads,
+        "dabs": sum(len(batch) for batch in batches),
+        "p50_ms": p50,
+        "p90_ms": p90,
+        "p99_ms": p99,
+        "end_stroke_ms": end_stroke * 1000.0,
+        "keys_modified": stats.counters["keys_modified"],
+        "keys_per_s": stats.counters["keys_modified"] / total if total else 0.0,
+        "stages_ms": {name: secs * 1000.0 for name, secs in stats.seconds.items()},
+    }
+
+
+def parse_ints(text):
+    return [int(float(part)) for part in text.split(",") if part]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100,1000,10000,100000,1000000",
+                        help="comma separated keys per curve")
+    parser.add_argument("--channels", default="1,10,100,1000",
+                        help="comma separated number of curves")
+    parser.add_argument("--modes", default=",".join(BRUSH_MODES),
+                        help="comma separated brush modes")
+    parser.add_argument("--data", choices=("smooth", "mocap", "both"), default="both")
+    parser.add_argument("--dabs", type=int, default=100, help="dabs per stroke")
+    parser.add_argument("--max-keys", type=float, default=5e6,
+                        help="skip cases with more keys in total than this")
+    parser.add_argument("--threads", action="store_true",
+                        help="run the kernels on the worker pool for large selections")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--quick", action="store_true",
+                        help="small matrix for a fast regression check")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    parser.add_argument("--recording", metavar="PATH",
+                        help="replay a recorded stroke (.npz) instead of a synthetic one")
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.sizes, args.channels, args.dabs = "1000,100000", "1,100", 30
+
+    kinds = ("smooth", "mocap") if args.data == "both" else (args.data,)
+    modes = [m for m in args.modes.split(",") if m]
+    recording = StrokeRecording.load(args.recording) if args.recording else None
+
+    header = f"{'data':<7}{'keys':>9}{'chan':>6} {'mode':<8}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'keys/s':>13}"
+    print(header)
+    print("-" * len(header))
+    results = []
+    for kind in kinds:
+        for count in parse_ints(args.sizes):
+            for channels in parse_ints(args.channels):
+                if count * channels > args.max_keys:
+                    continue
+                for mode in modes:
+                    # Same curves for every mode of a case, so modes compare
+                    rng = np.random.default_rng([args.seed, kinds.index(kind), count, channels])
+                    row = run_case(count, channels, kind, mode, args.dabs, rng, args.threads,
+                                   recording)
+                    row["empty"] = row["keys_modified"] == 0
+                    results.append(row)
+                    print(f"{kind:<7}{count:>9}{channels:>6} {mode:<8}{row['p50_ms']:>9.3f}"
+                          f"{row['p90_ms']:>9.3f}{row['p99_ms']:>9.3f}{row['keys_per_s']:>13,.0f}"
+                          + ("  no keys hit" if row["empty"] else ""))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as out:
+            json.dump(results, out, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
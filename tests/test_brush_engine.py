@@ -0,0 +1,339 @@
+"""Headless tests of the brush engine through the stand-ins in brush_engine.mock"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "FCurve_Smooth_Brush"))
+
+from brush_engine import (FALLOFF_TYPES, NOISE_TYPES, BrushEngine, FalloffTable,  # noqa: E402
+                          FlattenTarget, StrokeRecording, StrokeSpacer, UndoHistory, apply_mode,
+                          brush_footprint, butterworth, combine_hits, curve_key, falloff_profile,
+                          falloff_table, filter_fcurve, noise_field, read_curve, replay_stroke,
+                          savitzky_golay, write_curve)
+from brush_engine.mock import MockBrushSettings, MockView2D, make_curve  # noqa: E402
+
+
+def jittered_curve(count=500, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = np.arange(count, dtype=np.float64)
+    return make_curve(frames, np.sin(frames / 20.0) + rng.normal(0.0, 0.1, count))
+
+
+def on_curve(view, fcurve, frame):
+    """Region position of the curve's key at ``frame``"""
+    frame, value = fcurve.keyframe_points._data["co"][frame].tolist()
+    return ((frame - view.frame_min) / (view.frame_max - view.frame_min) * view.width,
+            (value - view.value_min) / (view.value_max - view.value_min) * view.height)
+
+
+def test_read_write_round_trip():
+    fcurve = jittered_curve()
+    arrays = read_curve(fcurve)
+    assert len(arrays) == len(fcurve.keyframe_points)
+    assert np.array_equal(arrays.co, fcurve.keyframe_points._data["co"])
+
+    arrays.co[10:20, 1] += 1.0
+    arrays.select[:] = True
+    arrays.mark_dirty("co", 10, 20)
+    arrays.mark_dirty("select_control_point")
+    assert write_curve(fcurve, arrays) == 2
+    assert not arrays.dirty
+
+    again = read_curve(fcurve)
+    assert np.array_equal(again.co, arrays.co)
+    assert np.array_equal(again.handle_left, arrays.handle_left)
+    assert again.select.all()
+    # Nothing dirty, nothing written
+    assert write_curve(fcurve, again) == 0
+
+
+def test_hits_match_brute_force():
+    fcurve = jittered_curve()
+    arrays = read_curve(fcurve)
+    view = MockView2D(0.0, 250.0, -2.0, 2.0, 1000, 600)
+    radius, strength = 40.0, 0.7
+    mouse_x, mouse_y = on_curve(view, fcurve, 100)
+
+    footprint = brush_footprint(view, mouse_x, mouse_y, radius)
+    indices, factors = combine_hits(arrays.times, arrays.values, [footprint],
+                                    [(0, len(arrays))], strength)
+
+    # Distance of every key to the brush centre in region pixels
+    x = (arrays.times.astype(np.float64) - view.frame_min) / (view.frame_max - view.frame_min) * view.width
+    y = (arrays.values.astype(np.float64) - view.value_min) / (view.value_max - view.value_min) * view.height
+    dist_sq = ((x - mouse_x) ** 2 + (y - mouse_y) ** 2) / radius ** 2
+    expected = np.flatnonzero(dist_sq <= 1.0)
+
+    assert len(expected)
+    assert np.array_equal(indices, expected)
+    # Default falloff is 1 - d², sampled from a lookup table
+    assert np.allclose(factors, (1.0 - dist_sq[expected]) * strength, atol=1e-3)
+
+
+def test_undo_redo_restores_stroke():
+    fcurve = jittered_curve()
+    original = fcurve.keyframe_points._data["co"].copy()
+    view = MockView2D(0.0, 250.0, -2.0, 2.0, 1000, 600)
+
+    engine = BrushEngine()
+    engine.begin_stroke([fcurve])
+    dabs = [on_curve(view, fcurve, 100), on_curve(view, fcurve, 105)]
+    changed = engine.apply_dabs(view, (1000, 600), dabs, MockBrushSettings(strength=1.0))
+    history = UndoHistory()
+    history.push(engine.end_stroke())
+    painted = fcurve.keyframe_points._data["co"].copy()
+    assert changed == 1
+    assert not np.array_equal(painted, original)
+
+    curves = {curve_key(fcurve): fcurve}
+    history.undo().apply(curves.get)
+    assert np.array_equal(fcurve.keyframe_points._data["co"], original)
+    assert history.undo() is None
+
+    history.redo().apply(curves.get, redo=True)
+    assert np.array_equal(fcurve.keyframe_points._data["co"], painted)
+    assert history.redo() is None
+
+
+def explicit_smooth(values, iterations, radius):
+    """``iterations`` whole-curve passes of a (2 * radius + 1)-key average, ends held"""
+    values = values.astype(np.float64)
+    box = np.full(2 * radius + 1, 1.0 / (2 * radius + 1))
+    for _ in range(iterations):
+        values = np.convolve(np.pad(values, radius, mode='reflect', reflect_type='odd'), box, mode='valid')
+    return values
+
+
+# (keys, iterations, radius), the first and third reach past both ends
+@pytest.mark.parametrize("count, iterations, radius", [(6, 10, 1), (20, 3, 10), (5, 7, 4), (50, 4, 3)])
+def test_smooth_matches_explicit_passes(count, iterations, radius):
+    rng = np.random.default_rng(count)
+    co = np.column_stack((np.arange(count, dtype=np.float64), rng.normal(size=count)))
+    expected = explicit_smooth(co[:, 1], iterations, radius)
+
+    indices = np.arange(count)
+    apply_mode('SMOOTH', co, indices, np.ones(count), iterations=iterations, radius=radius)
+    assert np.allclose(co[:, 1], expected, atol=1e-12)
+
+    # Brushing part of the curve still reads the keys around it
+    co[:, 1] = rng.normal(size=count)
+    expected = explicit_smooth(co[:, 1], iterations, radius)
+    part = indices[count // 3:2 * count // 3]
+    apply_mode('SMOOTH', co, part, np.ones(len(part)), iterations=iterations, radius=radius)
+    assert np.allclose(co[part, 1], expected[part], atol=1e-12)
+
+
+def test_flatten_targets_match_brute_force():
+    values = np.random.default_rng(3).normal(size=50).astype(np.float32)
+    target = FlattenTarget(values)
+    indices = np.array([0, 1, 7, 8, 9, 48, 49])
+
+    assert target.targets(indices) == pytest.approx(values.mean())
+    assert target.targets(indices, 'BRUSH') == pytest.approx(values.mean())
+    assert target.targets(indices[2:5], 'BRUSH') == pytest.approx(values[7:10].mean())
+    # Windows are cut short at the ends of the curve
+    expected = [values[max(i - 3, 0):i + 4].mean() for i in indices]
+    assert np.allclose(target.targets(indices, 'WINDOW', 3), expected)
+
+
+def test_flatten_converges_on_the_stroke_start_mean():
+    fcurve = jittered_curve()
+    mean = fcurve.keyframe_points._data["co"][:, 1].mean(dtype=np.float64)
+    view = MockView2D(0.0, 250.0, -2.0, 2.0, 1000, 600)
+    settings = MockBrushSettings(brush_mode='FLATTEN', brush_size=1000.0, strength=1.0,
+                                 falloff_type='CONSTANT')
+
+    engine = BrushEngine()
+    engine.begin_stroke([fcurve])
+    # Every dab heads for the mean the curve had when the stroke began
+    for _ in range(2):
+        engine.apply_dabs(view, (1000, 600), [(500.0, 300.0)], settings)
+    engine.end_stroke()
+    assert np.allclose(fcurve.keyframe_points._data["co"][:250, 1], mean, atol=1e-6)
+
+
+def test_relative_keeps_position_between_neighbours():
+    original = np.array([0.0, 1.0, 4.0, 2.0, 2.0, 2.0, 5.0])
+    co = np.column_stack((np.arange(7, dtype=np.float64), original))
+    indices = np.arange(7)
+    # Without falloff keys stay where they sat between their neighbours
+    apply_mode('RELATIVE', co, indices, np.zeros(7), original=original)
+    assert np.allclose(co[:, 1], original)
+
+    # Move the neighbours of key 2 apart, it keeps its fraction of the gap
+    co[[1, 3], 1] = (0.0, 10.0)
+    position = (original[2] - original[1]) / (original[3] - original[1])
+    apply_mode('RELATIVE', co, np.array([2]), np.zeros(1), original=original)
+    assert co[2, 1] == pytest.approx(10.0 * position)
+
+    # Full falloff is a three-key average, keys with level neighbours are left alone
+    co[:, 1] = original
+    apply_mode('RELATIVE', co, indices, np.ones(7), original=original)
+    assert co[1, 1] == pytest.approx(5.0 / 3.0)
+    assert co[4, 1] == original[4]
+    assert co[0, 1] == original[0] and co[6, 1] == original[6]
+
+
+def test_savitzky_golay_keeps_polynomials():
+    keys = np.arange(400, dtype=np.float64)
+    line = 0.5 * keys - 3.0
+    assert np.allclose(savitzky_golay(line, 9, 2), line, atol=1e-9)
+    # A quadratic is fitted exactly wherever the window is inside the curve
+    quadratic = 0.001 * (keys - 200.0) ** 2 - 0.3 * keys
+    assert np.allclose(savitzky_golay(quadratic, 9, 2)[4:-4], quadratic[4:-4], atol=1e-9)
+
+
+def test_butterworth_removes_high_frequencies_without_shift():
+    keys = np.arange(400, dtype=np.float64)
+    low = np.sin(2.0 * np.pi * 0.005 * keys)
+    high = 0.3 * np.sin(2.0 * np.pi * 0.2 * keys)
+    filtered = butterworth(low + high, 0.05, order=4)
+    assert np.abs(filtered - low)[50:-50].max() < 1e-3
+
+
+def test_filter_fcurve_moves_handles_with_keys():
+    fcurve = jittered_curve()
+    original = {attr: fcurve.keyframe_points._data[attr].copy()
+                for attr in ("co", "handle_left", "handle_right")}
+    assert filter_fcurve(fcurve, 'SAVGOL', (100, 199), window=9, order=2) == 100
+
+    data = fcurve.keyframe_points._data
+    moved = data["co"] - original["co"]
+    assert np.abs(moved[100:200, 1]).max() > 0.0
+    assert not moved[:100].any() and not moved[200:].any()
+    for attr in ("handle_left", "handle_right"):
+        assert np.allclose(data[attr] - original[attr], moved, atol=1e-6)
+
+
+@pytest.mark.parametrize("steps", [1, 7, 200])
+def test_spacer_spaces_dabs_evenly(steps):
+    spacer = StrokeSpacer(10.0)
+    dabs = [spacer.start(0.0, 0.0)]
+    # The same L-shaped path, in few or many mouse events
+    for x in np.linspace(0.0, 55.0, steps + 1)[1:]:
+        dabs.append(spacer.add(x, 0.0))
+    for y in np.linspace(0.0, 40.0, steps + 1)[1:]:
+        dabs.append(spacer.add(55.0, y))
+    dabs = np.concatenate(dabs)
+
+    expected = [(x, 0.0) for x in range(0, 60, 10)] + [(55.0, y) for y in range(5, 45, 10)]
+    assert np.allclose(dabs, expected)
+    # Short moves wait until the path is long enough for the next dab
+    assert not len(spacer.add(55.0, 44.0))
+    assert np.allclose(spacer.add(55.0, 46.0), [(55.0, 45.0)])
+
+
+@pytest.mark.parametrize("kind", [kind for kind in FALLOFF_TYPES if kind != 'CUSTOM'])
+def test_falloff_table_matches_profile(kind):
+    table = FalloffTable(kind)
+    dist_sq = np.linspace(0.0, 1.0, 1001)
+    expected = falloff_profile(kind, np.sqrt(dist_sq))
+    # One bin of squared distance is the only error, largest near the centre of LINEAR and SHARP
+    assert np.allclose(table(dist_sq), expected, atol=0.025)
+    assert table(np.array([1.0]))[0] == pytest.approx(expected[-1])
+    assert np.allclose(table.retained(dist_sq, 0.6), 1.0 - table(dist_sq) * 0.6)
+
+
+def test_custom_falloff_table():
+    # Full strength over the inner half, then a straight ramp down to the rim
+    table = falloff_table('CUSTOM', (1.0, 1.0, 0.0))
+    assert np.allclose(table(np.array([0.0, 0.2, 0.5625, 1.0])), (1.0, 1.0, 0.5, 0.0), atol=1e-3)
+    assert falloff_table('CUSTOM', table.curve, table) is table
+    assert falloff_table('SMOOTH', None, table) is not table
+    # Without curve samples CUSTOM falls back to SMOOTH
+    assert falloff_table('CUSTOM').kind == 'SMOOTH'
+
+
+@pytest.mark.parametrize("kind", NOISE_TYPES)
+def test_noise_is_reproducible(kind):
+    times = np.linspace(0.0, 200.0, 801)
+    first = noise_field(times, kind, 0.1, seed=7)
+    assert np.array_equal(first, noise_field(times, kind, 0.1, seed=7))
+    assert not np.array_equal(first, noise_field(times, kind, 0.1, seed=8))
+
+
+def test_decimate_stays_within_tolerance_and_undoes():
+    frames = np.arange(500, dtype=np.float64)
+    fcurve = make_curve(frames, np.sin(frames / 40.0))
+    original = fcurve.keyframe_points._data["co"].copy()
+    view = MockView2D(0.0, 250.0, -2.0, 2.0, 1000, 600)
+    settings = MockBrushSettings(brush_mode='DECIMATE', brush_size=150.0, strength=1.0,
+                                 decimate_error=0.005)
+
+    engine = BrushEngine()
+    engine.begin_stroke([fcurve])
+    for frame in (80, 100, 120) * 4:
+        engine.apply_dabs(view, (1000, 600), [on_curve(view, fcurve, frame)], settings)
+    history = UndoHistory()
+    history.push(engine.end_stroke())
+    decimated = fcurve.keyframe_points._data["co"].copy()
+    assert len(decimated) < len(original)
+
+    # The remaining keys, joined by straight lines, pass within the tolerance of every original key
+    line = np.interp(original[:, 0], decimated[:, 0], decimated[:, 1])
+    assert np.abs(line - original[:, 1]).max() <= settings.decimate_error + 1e-6
+
+    curves = {curve_key(fcurve): fcurve}
+    history.undo().apply(curves.get)
+    assert np.array_equal(fcurve.keyframe_points._data["co"], original)
+    history.redo().apply(curves.get, redo=True)
+    assert np.array_equal(fcurve.keyframe_points._data["co"], decimated)
+
+
+@pytest.mark.parametrize("mode", ['SMOOTH', 'FLATTEN', 'NOISE', 'DECIMATE'])
+def test_replay_in_batches_is_exact(mode, tmp_path):
+    painted, replayed = jittered_curve(), jittered_curve()
+    view = MockView2D(0.0, 250.0, -2.0, 2.0, 1000, 600)
+    settings = MockBrushSettings(brush_mode=mode, brush_size=80.0, strength=0.8)
+
+    engine = BrushEngine()
+    recording = StrokeRecording()
+    engine.begin_stroke([painted])
+    for frame in range(60, 140, 6):
+        dabs = [on_curve(view, painted, frame), on_curve(view, painted, frame + 3)]
+        engine.apply_dabs(view, (1000, 600), dabs, settings)
+        recording.add(view, (1000, 600), dabs, settings)
+    engine.end_stroke()
+
+    recording.save(tmp_path / "stroke.npz")
+    replay_stroke(StrokeRecording.load(tmp_path / "stroke.npz"), [replayed], single_pass=False)
+    for attr in ("co", "handle_left", "handle_right"):
+        assert np.array_equal(replayed.keyframe_points._data[attr], painted.keyframe_points._data[attr])
+
+
+def test_cache_keeps_edits_made_between_strokes():
+    fcurve = jittered_curve(1000)
+    view = MockView2D(0.0, 250.0, -2.0, 2.0, 1000, 600)
+    settings = MockBrushSettings(strength=1.0)
+    engine = BrushEngine()
+    history = UndoHistory()
+
+    engine.begin_stroke([fcurve])
+    engine.apply_dabs(view, (1000, 600), [on_curve(view, fcurve, 100)], settings)
+    history.push(engine.end_stroke())
+
+    # Edit a key the brush never reaches and that no signature samples
+    fcurve.keyframe_points._data["co"][901, 1] = 1.5
+    edited = fcurve.keyframe_points._data["co"].copy()
+
+    engine.begin_stroke([fcurve])
+    engine.apply_dabs(view, (1000, 600), [on_curve(view, fcurve, 100)], settings)
+    history.push(engine.end_stroke())
+    assert fcurve.keyframe_points._data["co"][901, 1] == 1.5
+
+    history.undo().apply({curve_key(fcurve): fcurve}.get)
+    assert np.array_equal(fcurve.keyframe_points._data["co"], edited)
+
+
+def test_curve_key_tells_owner_types_apart():
+    action_curve = jittered_curve(10)
+    driver_curve = jittered_curve(10)
+    action_curve.id_data.name = driver_curve.id_data.name = "Cube"
+    # A driver's owner is the ID it drives
+    driver_curve.id_data = type("MockObject", (), {"id_type": 'OBJECT', "name": "Cube"})()
+    assert curve_key(action_curve) == ('ACTION', "Cube", "location", 0)
+    assert curve_key(action_curve) != curve_key(driver_curve)